@@ -1,46 +1,222 @@
+import atexit
+import multiprocessing
+import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import metrics
+from logic import MAX_ATTEMPTS
+from scoring import WORD_LENGTH, labels, pack, pattern_key, score
+from word_index import get_index
+
+STRATEGIES = ("minimax", "entropy")
+
+# Fixed first guess per word length; other lengths choose their opener like any other move.
+OPENERS = {5: "CRANE"}
+
+# Below this many candidates the pool round trip costs more than it saves.
+PARALLEL_MIN_CANDIDATES = 60
+
+_pool = None
+_pool_workers = 0
+
+
+def _get_pool(workers):
+    """Process pool shared by every solver in this process, reused across moves and solves"""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        # spawn rather than fork so workers never inherit the UI server's threads
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+        _pool_workers = 0
+
+
+atexit.register(shutdown_pool)
+
+
+def get_feedback(guess, secret):
+    return labels(score(guess, secret), len(guess))
+
+
+def _worst_case(guess, secrets, cap):
+    """Largest feedback bucket of ``guess``, or None as soon as one reaches ``cap``"""
+    feedback_buckets = defaultdict(int)
+    worst_case = 0
+    for secret in secrets:
+        pattern = score(guess, secret)
+        count = feedback_buckets[pattern] + 1
+        if count >= cap:
+            return None
+        feedback_buckets[pattern] = count
+        if count > worst_case:
+            worst_case = count
+    return worst_case
+
+
+def _minimax_shard(guesses, secrets):
+    """Smallest worst-case bucket within one shard of guesses and its offset in the shard.
+
+    Only a strictly smaller worst case replaces the current best, so the
+    first guess wins ties exactly like the serial loop. That also means a
+    guess can stop being scored once any bucket reaches the current best.
+    """
+    best_offset = None
+    min_max_remaining = float('inf')
+
+    for offset, guess in enumerate(guesses):
+        worst_case = _worst_case(guess, secrets, min_max_remaining)
+
+        if worst_case is not None:
+            min_max_remaining = worst_case
+            best_offset = offset
+
+    return min_max_remaining, best_offset
+
+
+def _minimax_anytime(guesses, secrets, deadline_at=None):
+    """Minimax over ``guesses`` that can stop at ``deadline_at`` (a perf_counter value).
+
+    Guesses are tried in descending letter-frequency order so a good bound
+    is found early and later guesses are pruned sooner. Ties still go to
+    the guess that comes first in ``guesses``, so a completed search picks
+    the same word as ``_minimax_shard``. Returns (worst case, index into
+    ``guesses``, guesses evaluated, completed).
+    """
+    letter_freq = defaultdict(int)
+    for word in secrets:
+        for letter in set(word):
+            letter_freq[letter] += 1
+    order = sorted(range(len(guesses)), key=lambda i: -sum(letter_freq[letter] for letter in set(guesses[i])))
+
+    best_index = None
+    min_max_remaining = float('inf')
+    evaluated = 0
+
+    for i in order:
+        if best_index is not None and deadline_at is not None and time.perf_counter() >= deadline_at:
+            return min_max_remaining, best_index, evaluated, False
+
+        # A guess earlier in list order also wins by equalling the best.
+        cap = min_max_remaining + 1 if best_index is not None and i < best_index else min_max_remaining
+        worst_case = _worst_case(guesses[i], secrets, cap)
+        evaluated += 1
+
+        if worst_case is not None:
+            min_max_remaining = worst_case
+            best_index = i
+
+    return min_max_remaining, best_index, evaluated, True
+
 
 class AISolver:
-    def __init__(self, word_list):
+    def __init__(self, word_list, matrix=None, strategy="minimax", workers=1, book=None, index=None,
+                 max_attempts=MAX_ATTEMPTS):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}, expected one of {STRATEGIES}")
+
         self.all_words = word_list
+        self.word_length = len(word_list[0]) if word_list else WORD_LENGTH
+        self.max_attempts = max_attempts
+        self.strategy = strategy
+        # Bitset WordIndex shared by every solver over the same dictionary;
+        # the candidate set is a bitmask over it rather than a list copy.
+        self.index = index if index is not None else get_index(word_list)
+        # Optional PatternMatrix over word_list; minimax uses it instead of
+        # calling _get_feedback for every guess/secret pair. The entropy
+        # strategy scans the whole dictionary and always needs one.
+        if matrix is None and strategy == "entropy":
+            from pattern_matrix import PatternMatrix
+            matrix = PatternMatrix(word_list)
+        self.matrix = matrix
+        # workers > 1 shards pure-Python minimax across a shared process pool.
+        self.workers = workers
+        # Precomputed OpeningBook; ignored if it was built for another
+        # dictionary or strategy, in which case every move is computed live.
+        if book is not None and not book.matches(word_list, strategy):
+            book = None
+        self.book = book
         self.reset()
 
     def reset(self):
-        self.possible_words = self.all_words.copy()
+        self.candidates = self.index.all_mask
+        self._possible_words = self.all_words
         self.guess_history = []
+        self.feedback_key = ""
 
-    def solve(self, secret_word):
+    @property
+    def possible_words(self):
+        if self._possible_words is None:
+            self._possible_words = self.index.words_in(self.candidates)
+        return self._possible_words
+
+    @possible_words.setter
+    def possible_words(self, words):
+        self.candidates = self.index.mask_of(words)
+        self._possible_words = list(words)
+
+    def solve(self, secret_word, deadline=None):
+        """Play ``secret_word`` to the end; ``deadline`` caps each minimax move, in seconds"""
+        return list(self.iter_solve(secret_word, deadline))
+
+    def iter_solve(self, secret_word, deadline=None):
+        """Yield each step of ``solve`` as soon as its guess is decided.
+
+        Closing the generator early (or just not resuming it) abandons the
+        run; the next ``iter_solve`` or ``solve`` starts from a reset.
+        """
         self.reset()
-        solution = []
 
-        for attempt in range(6):
-            guess, explanation = self._select_guess_with_explanation()
+        for attempt in range(self.max_attempts):
+            started = time.perf_counter()
+            guess, explanation = self._select_guess_with_explanation(deadline)
+            elapsed = time.perf_counter() - started
             feedback = self._get_feedback(guess, secret_word)
 
-            solution.append({
+            yield {
                 'guess': guess,
-                'remaining': len(self.possible_words),
+                'remaining': self.index.count(self.candidates),
                 'feedback': feedback,
-                'explanation': explanation
-            })
+                'explanation': explanation,
+                'time': elapsed
+            }
 
             if guess == secret_word:
                 break
 
             self._apply_constraints(guess, feedback)
 
-        return solution
+    @metrics.timed("solver.select")
+    def _select_guess_with_explanation(self, deadline=None):
+        if self.book is not None:
+            move = self.book.lookup(self.feedback_key)
+            if move is not None:
+                metrics.increment("solver.book_hits")
+                return move
 
-    def _select_guess_with_explanation(self):
-        if not self.guess_history:
-            return "CRANE", "First guess: Using optimal starting word 'CRANE'"
+        opener = OPENERS.get(self.word_length)
+        if not self.guess_history and opener is not None:
+            return opener, f"First guess: Using optimal starting word '{opener}'"
+
+        if self.strategy == "entropy":
+            return self._select_by_entropy()
 
         if len(self.possible_words) > 200:
             return self._select_by_letter_frequency()
 
-    
-        return self._select_by_minimax()
+        return self._select_by_minimax(deadline)
 
+    @metrics.timed("solver.letter_frequency")
     def _select_by_letter_frequency(self):
         letter_freq = defaultdict(int)
         for word in self.possible_words:
@@ -54,78 +230,95 @@ class AISolver:
         explanation = f"CSP-style: Picked word with most common letters among {len(self.possible_words)} words"
         return best_word, explanation
 
-    def _select_by_minimax(self):
-        best_guess = None
-        min_max_remaining = float('inf')
+    @metrics.timed("solver.minimax")
+    def _select_by_minimax(self, deadline=None):
+        if self.matrix is not None and self.matrix.covers(self.possible_words):
+            return self._select_by_minimax_matrix()
+
+        if deadline is not None:
+            return self._select_by_minimax_anytime(deadline)
 
-        for guess in self.possible_words:
-            feedback_buckets = defaultdict(int)
+        if self.workers > 1 and len(self.possible_words) >= PARALLEL_MIN_CANDIDATES:
+            return self._select_by_minimax_parallel()
 
-            for secret in self.possible_words:
-                feedback = tuple(self._get_feedback(guess, secret))
-                feedback_buckets[feedback] += 1
+        min_max_remaining, offset = _minimax_shard(self.possible_words, self.possible_words)
+        best_guess = self.possible_words[offset]
 
-            worst_case = max(feedback_buckets.values())
+        explanation = f"Minimax: Picked word that minimizes worst-case remaining words to {min_max_remaining}"
+        return best_guess, explanation
+
+    def _select_by_minimax_anytime(self, deadline):
+        words = self.possible_words
+        min_max_remaining, index, evaluated, completed = _minimax_anytime(
+            words, words, time.perf_counter() + deadline
+        )
+        best_guess = words[index]
+
+        explanation = f"Minimax: Picked word that minimizes worst-case remaining words to {min_max_remaining}"
+        if completed:
+            explanation += f" (search complete over {len(words)} guesses)"
+        else:
+            explanation += f" (deadline of {deadline:g}s hit after {evaluated} of {len(words)} guesses; best so far)"
+        return best_guess, explanation
 
+    def _select_by_minimax_parallel(self):
+        guesses = self.possible_words
+        shard_size = -(-len(guesses) // (self.workers * 4))
+        shards = [guesses[i:i + shard_size] for i in range(0, len(guesses), shard_size)]
+
+        best_guess = None
+        min_max_remaining = float('inf')
+
+        # map() yields shard results in submission order, so reducing with a
+        # strict comparison keeps the serial tie-breaking.
+        results = _get_pool(self.workers).map(_minimax_shard, shards, repeat(guesses))
+        for shard, (worst_case, offset) in zip(shards, results):
             if worst_case < min_max_remaining:
                 min_max_remaining = worst_case
-                best_guess = guess
+                best_guess = shard[offset]
 
         explanation = f"Minimax: Picked word that minimizes worst-case remaining words to {min_max_remaining}"
         return best_guess, explanation
 
-    def _get_feedback(self, guess, secret):
-        feedback = ['absent'] * 5
-        secret_letter_counts = defaultdict(int)
+    def _select_by_minimax_matrix(self):
+        candidates = self.matrix.indices(self.possible_words)
+        best_guess = None
+        min_max_remaining = float('inf')
 
-        for letter in secret:
-            secret_letter_counts[letter] += 1
+        for guess, row in zip(self.possible_words, candidates):
+            worst_case = self.matrix.worst_case_bucket(row, candidates)
 
-        for i in range(5):
-            if guess[i] == secret[i]:
-                feedback[i] = 'correct'
-                secret_letter_counts[guess[i]] -= 1
+            if worst_case < min_max_remaining:
+                min_max_remaining = worst_case
+                best_guess = guess
 
-        for i in range(5):
-            if feedback[i] == 'correct':
-                continue
-            if secret_letter_counts[guess[i]] > 0:
-                feedback[i] = 'present'
-                secret_letter_counts[guess[i]] -= 1
+        explanation = f"Minimax: Picked word that minimizes worst-case remaining words to {min_max_remaining}"
+        return best_guess, explanation
 
-        return feedback
+    @metrics.timed("solver.entropy")
+    def _select_by_entropy(self):
+        candidates = self.matrix.indices(self.possible_words)
+        scores = self.matrix.entropies(candidates)
+
+        # Among equally informative guesses prefer one that could be the answer.
+        best_score = scores.max()
+        tied = set((scores >= best_score - 1e-9).nonzero()[0].tolist())
+        best_index = next((i for i in candidates.tolist() if i in tied), min(tied))
+        best_guess = self.matrix.words[best_index]
+
+        kind = "candidate" if best_guess in self.possible_words else "probe word"
+        explanation = (
+            f"Entropy: Picked {kind} with {best_score:.2f} bits of expected information "
+            f"over {len(self.possible_words)} words (scanned {len(self.matrix.words)} guesses)"
+        )
+        return best_guess, explanation
 
+    def _get_feedback(self, guess, secret):
+        return get_feedback(guess, secret)
 
+    @metrics.timed("solver.filter")
     def _apply_constraints(self, guess, feedback):
-        new_possible = []
-
-        for word in self.possible_words:
-            keep_word = True
-            temp_word = list(word)
-
-            for i in range(5):
-                if feedback[i] == 'correct':
-                    if word[i] != guess[i]:
-                        keep_word = False
-                        break
-                    temp_word[i] = None
-
-            if not keep_word:
-                continue
-
-            for i in range(5):
-                if feedback[i] == 'present':
-                    if guess[i] not in temp_word:
-                        keep_word = False
-                        break
-                    temp_word[temp_word.index(guess[i])] = None
-                elif feedback[i] == 'absent':
-                    if guess[i] in temp_word:
-                        keep_word = False
-                        break
-
-            if keep_word:
-                new_possible.append(word)
-
-        self.possible_words = new_possible
-        self.guess_history.append(guess)
\ No newline at end of file
+        self.candidates = self.index.filter(self.candidates, guess, feedback)
+        self._possible_words = None
+        self.guess_history.append(guess)
+        self.feedback_key += pattern_key(pack(feedback), len(feedback))
\ No newline at end of file
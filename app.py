@@ -1,22 +1,39 @@
 import streamlit as st
-import sqlite3
-import hashlib
 import re
 import pandas as pd
-from logic import Wuzzle
-from word_generator import WordGenerator
-from ai_solver import AISolver
-from archive import init_archive_db, archive_guess, get_user_archive
-
-if 'word_generator' not in st.session_state:
-    st.session_state.word_generator = WordGenerator()
+import metrics
+from schema import ensure_schema
+from logic import MAX_ATTEMPTS, Wuzzle
+from dictionary import LENGTHS, WORD_LENGTH
+from resources import shared_word_generator, new_solver, session_footprint
+from archive import archive_guess, get_user_archive
+from user_manager import create_user, authenticate_user, record_game_result, StatsCache
+from leaderboard import get_leaderboard, get_user_rank
+from stats import hardest_words
+
+HISTORY_PAGE_SIZE = 20
+# Per-move time budget for the AI Solver Lab's minimax search, in seconds.
+SOLVER_MOVE_DEADLINE = 2.0
+ATTEMPT_CHOICES = range(3, 11)
+
+# Dictionary, probability model and solver index are shared by every session
+# in this process and built per word length on first use; session_state only
+# holds per-player game and solver state.
+if 'word_length' not in st.session_state:
+    st.session_state.word_length = WORD_LENGTH
+
+if 'max_attempts' not in st.session_state:
+    st.session_state.max_attempts = MAX_ATTEMPTS
 
 if 'ai_solver' not in st.session_state:
-    st.session_state.ai_solver = AISolver(st.session_state.word_generator.valid_words)
+    st.session_state.ai_solver = new_solver(st.session_state.word_length, max_attempts=st.session_state.max_attempts)
+
+if 'stats_cache' not in st.session_state:
+    st.session_state.stats_cache = StatsCache()
 
 if 'game' not in st.session_state:
-    new_word = st.session_state.word_generator.generate_word()
-    st.session_state.game = Wuzzle(new_word)
+    new_word = shared_word_generator(length=st.session_state.word_length).generate_word()
+    st.session_state.game = Wuzzle(new_word, st.session_state.max_attempts)
 
 if 'guess_history' not in st.session_state:
     st.session_state.guess_history = []
@@ -33,129 +50,32 @@ if 'username' not in st.session_state:
 if 'auth_page' not in st.session_state:
     st.session_state.auth_page = "login"
 
-def init_db():
-    conn = sqlite3.connect('wuzzle_users.db')
-    c = conn.cursor()
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS users
-    (username TEXT PRIMARY KEY, password TEXT, games_played INTEGER, games_won INTEGER)
-    ''')
-    
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS leaderboard
-    (username TEXT PRIMARY KEY, 
-     games_played INTEGER DEFAULT 0, 
-     games_won INTEGER DEFAULT 0, 
-     score INTEGER DEFAULT 0,
-     last_update DATETIME DEFAULT CURRENT_TIMESTAMP,
-     FOREIGN KEY (username) REFERENCES users(username))
-    ''')
-    conn.commit()
-    conn.close()
-
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
-def create_user(username, password):
-    conn = sqlite3.connect('wuzzle_users.db')
-    c = conn.cursor()
-    
-    try:
-        hashed_pass = hash_password(password)
-        c.execute("INSERT INTO users (username, password, games_played, games_won) VALUES (?, ?, 0, 0)", 
-                 (username, hashed_pass))
-        conn.commit()
-        result = True
-    except sqlite3.IntegrityError:
-        result = False
-    
-    conn.close()
-    return result
-
-def authenticate_user(username, password):
-    conn = sqlite3.connect('wuzzle_users.db')
-    c = conn.cursor()
-    c.execute("SELECT password FROM users WHERE username = ?", (username,))
-    result = c.fetchone()
-    conn.close()
-    
-    if result and result[0] == hash_password(password):
-        return True
-    return False
-
-def update_user_stats(username, won=False):
-    conn = sqlite3.connect('wuzzle_users.db')
-    c = conn.cursor()
-    c.execute("UPDATE users SET games_played = games_played + 1 WHERE username = ?", (username,))
-    if won:
-        c.execute("UPDATE users SET games_won = games_won + 1 WHERE username = ?", (username,))
-    conn.commit()
-    conn.close()
-    
-    update_leaderboard(username, won)
-
-def get_user_stats(username):
-    conn = sqlite3.connect('wuzzle_users.db')
-    c = conn.cursor()
-    c.execute("SELECT games_played, games_won FROM users WHERE username = ?", (username,))
-    result = c.fetchone()
-    conn.close()
-    
-    if result:
-        return {"games_played": result[0], "games_won": result[1]}
-    return {"games_played": 0, "games_won": 0}
-
-def update_leaderboard(username, won=False):
-    conn = sqlite3.connect('wuzzle_users.db')
-    c = conn.cursor()
-    
-    score_to_add = 10 if won else 1
-    
-    c.execute("SELECT username FROM leaderboard WHERE username = ?", (username,))
-    user_exists = c.fetchone()
-    
-    if user_exists:
-        c.execute("""
-            UPDATE leaderboard 
-            SET games_played = games_played + 1, 
-                games_won = games_won + CASE WHEN ? THEN 1 ELSE 0 END,
-                score = score + ?,
-                last_update = CURRENT_TIMESTAMP
-            WHERE username = ?
-        """, (won, score_to_add, username))
-    else:
-        c.execute("""
-            INSERT INTO leaderboard (username, games_played, games_won, score)
-            VALUES (?, 1, ?, ?)
-        """, (username, 1 if won else 0, score_to_add))
-    
-    conn.commit()
-    conn.close()
-
-def get_leaderboard(limit=10):
-    conn = sqlite3.connect('wuzzle_users.db')
-    c = conn.cursor()
-    
-    c.execute("""
-        SELECT username, games_played, games_won, score, last_update
-        FROM leaderboard
-        ORDER BY score DESC
-        LIMIT ?
-    """, (limit,))
-    
-    results = c.fetchall()
-    conn.close()
-    
-    return results
-
 def restart_game():
-    new_word = st.session_state.word_generator.generate_word()
-    st.session_state.game = Wuzzle(new_word)
+    length = st.session_state.word_length
+    new_word = shared_word_generator(length=length).generate_word()
+    st.session_state.game = Wuzzle(new_word, st.session_state.max_attempts)
+    solver = st.session_state.ai_solver
+    if solver.word_length != length or solver.max_attempts != st.session_state.max_attempts:
+        st.session_state.ai_solver = new_solver(length, max_attempts=st.session_state.max_attempts)
     st.session_state.guess_history = []
     st.session_state.game_over = False
 
-init_db()
-init_archive_db()      
+def change_game_mode():
+    """Start a new game with the selected word length and attempt count"""
+    length = st.session_state.mode_length
+    try:
+        shared_word_generator(length=length)
+    except (FileNotFoundError, ValueError) as e:
+        st.session_state.mode_error = str(e)
+        st.session_state.mode_length = st.session_state.word_length
+        return
+    st.session_state.mode_error = None
+    st.session_state.word_length = length
+    st.session_state.max_attempts = st.session_state.mode_attempts
+    restart_game()
+
+ensure_schema()
+metrics.start_exporter()
 
 def show_login_page():
     st.title("🔐 Login to Wuzzle")
@@ -212,10 +132,10 @@ def show_signup_page():
 def show_game_page():
     st.title("🟨🟩 Wuzzle Word Game")
     
-    tab1, tab2 = st.tabs(["Game", "🏆 Leaderboard"])
+    tab1, tab2, tab3 = st.tabs(["Game", "🏆 Leaderboard", "📜 History"])
     
     with tab1:
-        user_stats = get_user_stats(st.session_state.username)
+        user_stats = st.session_state.stats_cache.get(st.session_state.username)
         col1, col2, col3 = st.columns([1, 1, 1])
         
         with col1:
@@ -233,14 +153,65 @@ def show_game_page():
                 st.session_state.authenticated = False
                 st.session_state.username = ""
                 st.rerun()
+
+            st.subheader("Game Mode")
+            st.selectbox(
+                "Word length",
+                list(LENGTHS),
+                index=list(LENGTHS).index(st.session_state.word_length),
+                key='mode_length',
+                on_change=change_game_mode,
+            )
+            st.selectbox(
+                "Attempts",
+                list(ATTEMPT_CHOICES),
+                index=list(ATTEMPT_CHOICES).index(st.session_state.max_attempts),
+                key='mode_attempts',
+                on_change=change_game_mode,
+            )
+            if st.session_state.get('mode_error'):
+                st.error(st.session_state.mode_error)
+
+            if metrics.is_admin(st.session_state.username):
+                with st.expander("Session memory"):
+                    # Walking session_state is expensive, so only measure on request.
+                    if st.button("Measure", key='measure_session'):
+                        footprint = session_footprint(st.session_state)
+                        st.caption(f"{sum(footprint.values()) / 1024:.1f} KB held by this session")
+                        for key, size in sorted(footprint.items(), key=lambda item: -item[1]):
+                            st.caption(f"{key}: {size / 1024:.1f} KB")
+                    cache = st.session_state.stats_cache
+                    st.caption(f"Stats cache: {cache.hits} hits, {cache.misses} misses")
+
+                with st.expander("⏱ Timings"):
+                    if not metrics.ENABLED:
+                        st.caption("Set WUZZLE_METRICS=1 to collect timings.")
+                    else:
+                        snap = metrics.snapshot()
+                        timings_df = pd.DataFrame([
+                            {
+                                "Timer": name,
+                                "Calls": t["count"],
+                                "Mean ms": round(t["sum"] / t["count"] * 1000, 2) if t["count"] else 0.0,
+                                "p95 ms": round(t["p95"] * 1000, 2),
+                                "Max ms": round(t["max"] * 1000, 2),
+                            }
+                            for name, t in sorted(snap["timers"].items())
+                        ])
+                        st.dataframe(timings_df, use_container_width=True, hide_index=True)
+                        for name, value in sorted(snap["counters"].items()):
+                            st.caption(f"{name}: {value}")
         
+        word_length = st.session_state.game.max_word_length
+        max_attempts = st.session_state.game.max_attempts
+
         with st.expander("📋 Game Rules"):
-            st.markdown("""
+            st.markdown(f"""
             ### How to Play Wuzzle:
             
-            1. **Objective:** Guess the secret 5-letter word within 6 attempts.
+            1. **Objective:** Guess the secret {word_length}-letter word within {max_attempts} attempts.
             
-            2. **Making a Guess:** Enter a valid 5-letter word and submit your guess.
+            2. **Making a Guess:** Enter a valid {word_length}-letter word and submit your guess.
             
             3. **Feedback:**
                - 🟩 Green: Letter is correct and in the right position
@@ -249,14 +220,14 @@ def show_game_page():
             
             4. **Strategy:** Use the feedback from previous guesses to narrow down possibilities.
             
-            5. **Winning:** Guess the correct word within 6 attempts to win!
+            5. **Winning:** Guess the correct word within {max_attempts} attempts to win!
             
-            6. **Losing:** If you don't guess the word within 6 attempts, the game is over and the secret word will be revealed.
+            6. **Losing:** If you don't guess the word within {max_attempts} attempts, the game is over and the secret word will be revealed.
             """)
 
         guess_input = st.text_input(
-            "Enter your guess (5-letter word):",
-            max_chars=5,
+            f"Enter your guess ({word_length}-letter word):",
+            max_chars=word_length,
             disabled=st.session_state.game_over,
             key='guess_input'
         )
@@ -282,11 +253,11 @@ def show_game_page():
                     st.balloons()
                     st.success("🎉 Correct! You've solved the puzzle!")
                     st.session_state.game_over = True
-                    update_user_stats(st.session_state.username, won=True)
+                    record_game_result(st.session_state.username, True, st.session_state.game.attempts, st.session_state.game.secret)
                 elif not st.session_state.game.can_attempt():
                     st.error(f"Game Over! The word was {st.session_state.game.secret}")
                     st.session_state.game_over = True
-                    update_user_stats(st.session_state.username, won=False)
+                    record_game_result(st.session_state.username, False, st.session_state.game.attempts, st.session_state.game.secret)
 
         if st.session_state.game_over:
             if st.button("Play Again"):
@@ -305,24 +276,28 @@ def show_game_page():
         st.header("🧠 AI Solver Lab")
 
         target_word = st.text_input(
-            "Enter a 5-letter word for the AI to solve:",
-            max_chars=5,
+            f"Enter a {word_length}-letter word for the AI to solve:",
+            max_chars=word_length,
             key='target_word'
         )
 
         if st.button("Run AI Solver"):
-            if len(target_word) != 5:
-                st.warning("Please enter exactly 5 letters")
+            if len(target_word) != word_length:
+                st.warning(f"Please enter exactly {word_length} letters")
             else:
-                st.session_state.ai_solver.reset()
-                solution = st.session_state.ai_solver.solve(target_word.upper())
-                
                 st.subheader(f"🧠 AI Solution for: {target_word.upper()}")
-                
-                for i, step in enumerate(solution, 1):
+                # Any click reruns the script, which abandons the solver
+                # generator, so this button is all cancelling needs.
+                st.button("Stop Solver")
+                status = st.empty()
+                status.caption("Thinking about move 1...")
+
+                steps = st.session_state.ai_solver.iter_solve(target_word.upper(), deadline=SOLVER_MOVE_DEADLINE)
+                for i, step in enumerate(steps, 1):
                     with st.expander(f"Move {i}: {step['guess']}", expanded=i==1):
                         cols = st.columns(2)
                         cols[0].metric("Possible Words Remaining", step['remaining'])
+                        cols[1].metric("Decision Time", f"{step['time'] * 1000:.0f} ms")
                         
                         explanation_lines = step['explanation'].split('\n')
                         for line in explanation_lines:
@@ -346,6 +321,9 @@ def show_game_page():
                             st.balloons()
                             st.success(f"✅ Solved in {i} moves!")
 
+                    status.caption(f"Thinking about move {i + 1}...")
+                status.empty()
+
     with tab2:
         st.header("🏆 Leaderboard")
         leaderboard_data = get_leaderboard(limit=20)
@@ -379,18 +357,50 @@ def show_game_page():
                 hide_index=True
             )
             
-            current_user_rank = None
-            for i, player in enumerate(leaderboard_data):
-                if player[0] == st.session_state.username:
-                    current_user_rank = i + 1
-                    break
-            
-            if current_user_rank:
-                st.info(f"Your current rank: #{current_user_rank} of {len(leaderboard_data)}")
+            user_rank = get_user_rank(st.session_state.username)
+            if user_rank:
+                current_user_rank, total_players = user_rank
+                st.info(f"Your current rank: #{current_user_rank} of {total_players}")
             
         else:
             st.info("Be the first to join the leaderboard by playing a game!")
 
+        hardest = hardest_words(limit=10, min_games=3)
+        if hardest:
+            st.subheader("🧩 Hardest Words")
+            hardest_df = pd.DataFrame(hardest)
+            hardest_df["win_rate"] = (hardest_df["win_rate"] * 100).round().astype(int).astype(str) + "%"
+            hardest_df["avg_guesses"] = hardest_df["avg_guesses"].round(2)
+            hardest_df = hardest_df.rename(columns={
+                "word": "Word", "games": "Games", "win_rate": "Win Rate", "avg_guesses": "Avg Guesses",
+            })
+            st.dataframe(hardest_df[["Word", "Games", "Win Rate", "Avg Guesses"]], use_container_width=True, hide_index=True)
+
+    with tab3:
+        st.header("📜 Your Guess History")
+
+        if 'history_pages' not in st.session_state:
+            st.session_state.history_pages = [None]
+
+        before_id = st.session_state.history_pages[-1]
+        history = get_user_archive(st.session_state.username, before_id=before_id, limit=HISTORY_PAGE_SIZE)
+
+        if history:
+            history_df = pd.DataFrame(history, columns=["ID", "Guess", "Word", "Time"])
+            st.dataframe(history_df[["Time", "Guess", "Word"]], use_container_width=True, hide_index=True)
+        else:
+            st.info("No guesses archived yet.")
+
+        col1, col2 = st.columns([1, 1])
+        with col1:
+            if st.button("Newer", disabled=len(st.session_state.history_pages) == 1):
+                st.session_state.history_pages.pop()
+                st.rerun()
+        with col2:
+            if st.button("Older", disabled=len(history) < HISTORY_PAGE_SIZE):
+                st.session_state.history_pages.append(history[-1][0])
+                st.rerun()
+
 def main():
     if not st.session_state.authenticated:
         if st.session_state.auth_page == "login":
@@ -398,7 +408,8 @@ def main():
         else:
             show_signup_page()
     else:
-        show_game_page()
+        with metrics.timer("render.game_page"):
+            show_game_page()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,34 +1,336 @@
-import sqlite3
-from datetime import datetime
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import Counter
 
-DB_NAME = "wuzzle_users.db"
+import db
+import metrics
+from schema import ensure_schema
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 0.25
+MAX_QUEUE = 10000
+
+PAGE_SIZE = 50
+
+INSERT_GUESS = "INSERT INTO archive (username, word, realWord) VALUES (?, ?, ?)"
+ARCHIVE_COLUMNS = ('word', 'realWord', 'timestamp')
 
 def init_archive_db():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS archive (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL,
-            word TEXT NOT NULL,
-            realWord TEXT NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    ensure_schema()
+
+
+class ArchiveWriter:
+    """Write-behind queue for archive rows.
+
+    Records are queued in memory and inserted by a background thread, one
+    transaction per batch, whenever ``batch_size`` records are waiting or
+    ``flush_interval`` seconds have passed since the first one arrived. The
+    queue is bounded, so producers block instead of growing memory if the
+    database falls behind. ``flush`` commits whatever is waiting right away
+    and ``close`` drains everything still queued.
+    """
+
+    _STOP = object()
+
+    def __init__(self, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, max_queue=MAX_QUEUE, retries=3):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        # Seconds spent in batch transactions, retries included.
+        self.write_seconds = 0.0
+        self._queue = queue.Queue(maxsize=max_queue)
+        # Records per username submitted but not yet written (or dropped).
+        self._pending = Counter()
+        self._pending_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="archive-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, username, word, realWord):
+        if self._closed:
+            raise RuntimeError("ArchiveWriter is closed")
+        with self._pending_lock:
+            self._pending[username] += 1
+        self._queue.put((username, word.upper(), realWord.upper()))
+
+    def stats(self):
+        return {
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+            "write_seconds": self.write_seconds,
+        }
+
+    def pending(self, username):
+        """Number of this user's records still waiting to be written"""
+        return self._pending.get(username, 0)
+
+    def flush(self):
+        """Commit every record submitted before this call now and wait for it.
+
+        A marker goes into the queue behind those records; the writer ends its
+        batch when it reaches the marker instead of waiting out the flush
+        interval, so records other threads submit later are not waited for.
+        """
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                self._queue.task_done()
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+                self._queue.task_done()
+                continue
+
+            batch = [item]
+            marker = None
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    marker = item
+                    break
+                batch.append(item)
+
+            started = time.perf_counter()
+            self._write(batch)
+            self.write_seconds += time.perf_counter() - started
+            with self._pending_lock:
+                self._pending.subtract(record[0] for record in batch)
+                self._pending += Counter()
+            if marker is not None:
+                marker.set()
+            for _ in range(len(batch) + stop + (marker is not None)):
+                self._queue.task_done()
+            if stop:
+                return
+
+    @metrics.timed("db.archive_batch")
+    def _write(self, batch):
+        for attempt in range(self.retries + 1):
+            try:
+                with db.transaction() as conn:
+                    conn.executemany(INSERT_GUESS, batch)
+                self.written += len(batch)
+                self.batches += 1
+                return
+            except Exception:
+                if attempt == self.retries:
+                    self.failed += len(batch)
+                    logger.exception("Dropping %d archive records after %d attempts", len(batch), attempt + 1)
+                    return
+                time.sleep(0.05 * 2 ** attempt)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = ArchiveWriter()
+    return _writer
+
+
+def close_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+
+
+atexit.register(close_writer)
+
 
+@metrics.timed("db.archive_guess")
 def archive_guess(username, word, realWord):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("INSERT INTO archive (username, word, realWord) VALUES (?, ?, ?)", (username, word.upper(), realWord.upper()))
-    conn.commit()
-    conn.close()
-
-def get_user_archive(username):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT word, timestamp FROM archive WHERE username = ? ORDER BY timestamp DESC", (username,))
-    results = c.fetchall()
-    conn.close()
-    return results
\ No newline at end of file
+    get_writer().submit(username, word, realWord)
+
+def archive_guess_sync(username, word, realWord):
+    db.execute(INSERT_GUESS, (username, word.upper(), realWord.upper()))
+
+def get_user_archive(username, before_id=None, limit=PAGE_SIZE):
+    """One page of a user's guesses, newest first, as (id, word, realWord, timestamp) rows.
+
+    Pass the id of the last row of a page as ``before_id`` to get the next one.
+    Only flushes the write-behind queue when this user still has guesses in it,
+    so ordinary reruns read straight from the database.
+    """
+    if _writer is not None and _writer.pending(username):
+        _writer.flush()
+    return paginate('archive', ARCHIVE_COLUMNS, username, before_id, limit)
+
+
+def paginate(table, columns, username, before_id=None, limit=PAGE_SIZE):
+    """Keyset page of a user's rows ordered by (timestamp, id) descending.
+
+    The (username, timestamp) index already ends in the rowid, so each page
+    is a range scan that starts right after the previous one instead of an
+    OFFSET over everything before it.
+    """
+    select = f"SELECT id, {', '.join(columns)} FROM {table}"
+    if before_id is None:
+        return db.fetchall(f"""
+            {select}
+            WHERE username = ?
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+        """, (username, limit))
+    return db.fetchall(f"""
+        {select}
+        WHERE username = ?
+          AND (timestamp, id) < (SELECT timestamp, id FROM {table} WHERE id = ?)
+        ORDER BY timestamp DESC, id DESC
+        LIMIT ?
+    """, (username, before_id, limit))
+
+
+def stream(table, columns, username=None, batch_size=1000):
+    """Yield (id, *columns) rows oldest first without loading them all.
+
+    Rows are pulled from an open cursor ``batch_size`` at a time, so memory
+    stays constant however long the history is. The pooled connection is
+    held until the generator is exhausted or closed.
+    """
+    select = f"SELECT id, {', '.join(columns)} FROM {table}"
+    if username is None:
+        sql, params = f"{select} ORDER BY id", ()
+    else:
+        sql, params = f"{select} WHERE username = ? ORDER BY timestamp, id", (username,)
+
+    with db.connection() as conn:
+        cursor = conn.execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
+
+EXPORT_TABLES = {
+    'archive': ('username',) + ARCHIVE_COLUMNS,
+    'games': ('username', 'word', 'guesses', 'attempts', 'won', 'timestamp'),
+}
+
+
+def export_archive(out, fmt="csv", username=None, table="archive"):
+    """Stream a user's (or everyone's) history to a CSV or JSONL file object; returns the row count"""
+    import csv
+    import json
+
+    if table == 'archive' and _writer is not None:
+        _writer.flush()
+
+    header = ('id',) + EXPORT_TABLES[table]
+    rows = stream(table, EXPORT_TABLES[table], username)
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif fmt == "jsonl":
+        for row in rows:
+            out.write(json.dumps(dict(zip(header, row))) + "\n")
+            count += 1
+    else:
+        raise ValueError(f"Unknown export format {fmt!r}, expected 'csv' or 'jsonl'")
+    return count
+
+
+def benchmark(n=2000, path=None):
+    """Guesses per second through the synchronous path and the write-behind writer"""
+    import os
+    import tempfile
+
+    path = path or os.path.join(tempfile.mkdtemp(), "archive_bench.db")
+    db.configure(path)
+    init_archive_db()
+    results = {}
+
+    started = time.perf_counter()
+    for i in range(n):
+        archive_guess_sync("bench", "CRANE", "REACT")
+    results['sync'] = n / (time.perf_counter() - started)
+
+    writer = ArchiveWriter()
+    started = time.perf_counter()
+    for i in range(n):
+        writer.submit("bench", "CRANE", "REACT")
+    enqueued = time.perf_counter() - started
+    writer.close()
+    results['write_behind_enqueue'] = n / enqueued
+    results['write_behind_committed'] = n / (time.perf_counter() - started)
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Archive maintenance tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bench = commands.add_parser("bench", help="compare synchronous and write-behind archive throughput")
+    bench.add_argument("-n", type=int, default=2000, help="guesses to archive per mode")
+    bench.add_argument("--db", help="database file (default: a temp file)")
+
+    export = commands.add_parser("export", help="stream history to CSV or JSONL")
+    export.add_argument("out", help="output file, or - for stdout")
+    export.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    export.add_argument("--user", help="only this user's rows (default: the whole table)")
+    export.add_argument("--table", choices=sorted(EXPORT_TABLES), default="archive")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        for mode, rate in benchmark(args.n, args.db).items():
+            print(f"{mode}: {rate:,.0f} guesses/s")
+    else:
+        init_archive_db()
+        if args.out == "-":
+            count = export_archive(sys.stdout, args.format, args.user, args.table)
+        else:
+            with open(args.out, "w", newline="", encoding="utf-8") as f:
+                count = export_archive(f, args.format, args.user, args.table)
+        print(f"Exported {count} rows", file=sys.stderr)
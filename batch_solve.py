@@ -0,0 +1,152 @@
+"""Headless batch runner: solve every dictionary word with each solver strategy.
+
+    python batch_solve.py --strategies minimax entropy --sample 500 --out results.json
+
+Reports the guess-count distribution, failure rate and solve/move timings per
+strategy and writes them as JSON so runs can be compared between versions.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from ai_solver import AISolver, STRATEGIES
+from dictionary import LENGTHS, WORD_LENGTH, load_words
+from opening_book import OpeningBook
+from pattern_matrix import word_list_hash
+
+_words = None
+_solvers = {}
+
+
+def _init_worker(words):
+    global _words
+    _words = words
+    _solvers.clear()
+
+
+def _get_solver(strategy):
+    if strategy not in _solvers:
+        _solvers[strategy] = AISolver(_words, strategy=strategy, book=OpeningBook.load_for(_words, strategy))
+    return _solvers[strategy]
+
+
+def _solve_chunk(strategy, secrets):
+    solver = _get_solver(strategy)
+    results = []
+    for secret in secrets:
+        started = time.perf_counter()
+        solution = solver.solve(secret)
+        elapsed = time.perf_counter() - started
+        results.append({
+            'secret': secret,
+            'guesses': len(solution),
+            'solved': solution[-1]['guess'] == secret,
+            'time': elapsed,
+            'move_times': [step['time'] for step in solution],
+        })
+    return results
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(results):
+    solve_times = [r['time'] for r in results]
+    move_times = [t for r in results for t in r['move_times']]
+    solved = [r for r in results if r['solved']]
+    distribution = Counter(r['guesses'] for r in solved)
+
+    return {
+        'games': len(results),
+        'distribution': {str(k): distribution[k] for k in sorted(distribution)},
+        'failures': len(results) - len(solved),
+        'failure_rate': (len(results) - len(solved)) / len(results) if results else 0.0,
+        'mean_guesses': sum(r['guesses'] for r in solved) / len(solved) if solved else None,
+        'solve_time': {
+            'mean': sum(solve_times) / len(solve_times) if solve_times else 0.0,
+            'p99': percentile(solve_times, 99),
+        },
+        'move_time': {
+            'mean': sum(move_times) / len(move_times) if move_times else 0.0,
+            'p99': percentile(move_times, 99),
+        },
+        'failed_words': sorted(r['secret'] for r in results if not r['solved']),
+    }
+
+
+def run(words, strategies, sample=None, seed=0, workers=None, chunk_size=25):
+    secrets = list(words)
+    if sample and sample < len(secrets):
+        secrets = random.Random(seed).sample(secrets, sample)
+
+    if "entropy" in strategies:
+        # Build the on-disk pattern matrix once so workers only memory-map it.
+        AISolver(words, strategy="entropy")
+
+    chunks = [secrets[i:i + chunk_size] for i in range(0, len(secrets), chunk_size)]
+    report = {
+        'meta': {
+            'dictionary_size': len(words),
+            'dictionary_hash': word_list_hash(words),
+            'sample': len(secrets),
+            'seed': seed,
+            'workers': workers or os.cpu_count(),
+            'python': platform.python_version(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        'strategies': {},
+    }
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(words,)) as pool:
+        for strategy in strategies:
+            started = time.perf_counter()
+            results = []
+            for chunk_results in pool.map(_solve_chunk, [strategy] * len(chunks), chunks):
+                results.extend(chunk_results)
+            summary = summarize(results)
+            summary['wall_time'] = time.perf_counter() - started
+            report['strategies'][strategy] = summary
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve every dictionary word and benchmark solver strategies")
+    parser.add_argument("--words", help="word list file, one word per line (default: packed dictionary)")
+    parser.add_argument("--length", type=int, default=WORD_LENGTH, choices=LENGTHS)
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES), choices=STRATEGIES)
+    parser.add_argument("--sample", type=int, help="solve a random sample of this many words")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--out", default="batch_results.json")
+    args = parser.parse_args()
+
+    words = load_words(args.words, args.length)
+    report = run(words, args.strategies, sample=args.sample, seed=args.seed, workers=args.workers)
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for strategy, summary in report['strategies'].items():
+        print(f"{strategy}: {summary['games']} games, "
+              f"failure rate {summary['failure_rate']:.2%}, "
+              f"mean guesses {summary['mean_guesses'] or 0:.3f}, "
+              f"solve mean {summary['solve_time']['mean'] * 1000:.1f} ms / p99 {summary['solve_time']['p99'] * 1000:.1f} ms, "
+              f"move mean {summary['move_time']['mean'] * 1000:.2f} ms / p99 {summary['move_time']['p99'] * 1000:.2f} ms")
+        print(f"  distribution: {summary['distribution']}")
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
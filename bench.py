@@ -0,0 +1,204 @@
+"""Micro-benchmarks for the game and solver hot paths.
+
+Every benchmark runs offline against the checked-in ``data/bench_words.txt``
+so numbers are comparable between runs. Each one reports the best ops/sec
+over several repeats and the peak bytes allocated by a single call, and is
+compared with ``data/bench_baseline.json``: a run fails (exit status 1) when
+any benchmark is slower or allocates more than the baseline by more than
+``--tolerance``. Baselines are machine-specific; refresh them with
+``python bench.py --save`` on the machine that runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from ai_solver import AISolver
+from dictionary import read_word_file
+from logic import Wuzzle
+from pattern_matrix import word_list_hash
+from word_generator import WordGenerator
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+BENCH_WORDS = os.path.join(DATA_DIR, "bench_words.txt")
+BASELINE = os.path.join(DATA_DIR, "bench_baseline.json")
+
+TOLERANCE = 0.25
+# Allocation regressions smaller than this many bytes are noise.
+ALLOC_SLACK = 1024
+MINIMAX_CANDIDATES = 120
+
+
+def _cycle(items):
+    """Callable returning the items round-robin, so every op sees a different input"""
+    state = [0]
+
+    def next_item():
+        i = state[0]
+        state[0] = (i + 1) % len(items)
+        return items[i]
+    return next_item
+
+
+def benchmarks(words):
+    """name -> zero-argument callable running one operation"""
+    rng = random.Random(0)
+    pairs = _cycle([(rng.choice(words), rng.choice(words)) for _ in range(1000)])
+    solver = AISolver(words)
+    secrets = _cycle(rng.sample(words, 100))
+    subset = rng.sample(words, MINIMAX_CANDIDATES)
+    generator = WordGenerator(BENCH_WORDS)
+
+    def wuzzle_guess():
+        guess, secret = pairs()
+        Wuzzle(secret).guess(guess)
+
+    def get_feedback():
+        guess, secret = pairs()
+        solver._get_feedback(guess, secret)
+
+    def apply_constraints():
+        secret = secrets()
+        solver.reset()
+        solver._apply_constraints("CRANE", solver._get_feedback("CRANE", secret))
+        solver.possible_words
+
+    def select_by_letter_frequency():
+        solver.reset()
+        solver._select_by_letter_frequency()
+
+    def select_by_minimax():
+        solver.possible_words = subset
+        solver._select_by_minimax()
+
+    def word_generator_init():
+        WordGenerator(BENCH_WORDS)
+
+    return {
+        "wuzzle_guess": wuzzle_guess,
+        "get_feedback": get_feedback,
+        "apply_constraints": apply_constraints,
+        "select_by_letter_frequency": select_by_letter_frequency,
+        "select_by_minimax": select_by_minimax,
+        "word_generator_init": word_generator_init,
+        "generate_word": generator.generate_word,
+    }
+
+
+def measure(fn, min_time=0.2, repeat=5):
+    """Best ops/sec over ``repeat`` timed runs and the peak bytes of one call"""
+    fn()
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9)))
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, time.perf_counter() - started)
+
+    peaks = []
+    tracemalloc.start()
+    for _ in range(3):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+
+    return {"ops_per_sec": loops / best, "peak_alloc_bytes": min(peaks)}
+
+
+def run(only=None, min_time=0.2, repeat=5):
+    words = read_word_file(BENCH_WORDS)
+    results = {}
+    for name, fn in benchmarks(words).items():
+        if only and name not in only:
+            continue
+        results[name] = measure(fn, min_time, repeat)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "words": len(words),
+            "word_list_hash": word_list_hash(words),
+        },
+        "results": results,
+    }
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Regression messages for every benchmark worse than its baseline"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if current["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {current['ops_per_sec']:,.0f} ops/s vs baseline {base['ops_per_sec']:,.0f}"
+            )
+        if current["peak_alloc_bytes"] > base["peak_alloc_bytes"] * (1 + tolerance) + ALLOC_SLACK:
+            regressions.append(
+                f"{name}: {current['peak_alloc_bytes']:,} bytes peak vs baseline {base['peak_alloc_bytes']:,}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game and solver hot paths")
+    parser.add_argument("--save", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="allowed fractional slowdown or allocation growth (default: %(default)s)")
+    parser.add_argument("--only", action="append", help="run just this benchmark; repeatable")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timed run")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    report = run(args.only, args.min_time, args.repeat)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    print(f"{'benchmark':<28}{'ops/s':>14}{'baseline':>14}{'peak bytes':>12}")
+    for name, result in report["results"].items():
+        base = baseline.get(name, {}).get("ops_per_sec")
+        base = f"{base:,.0f}" if base else "-"
+        print(f"{name:<28}{result['ops_per_sec']:>14,.0f}{base:>14}{result['peak_alloc_bytes']:>12,}")
+
+    if args.save:
+        if args.only and os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                stored = json.load(f)
+            stored["results"].update(report["results"])
+            report = stored
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    regressions = compare(report["results"], baseline, args.tolerance)
+    if regressions:
+        print(f"\nRegressions beyond {args.tolerance:.0%}:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
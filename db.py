@@ -0,0 +1,142 @@
+"""Shared SQLite data-access layer.
+
+Every module talks to the database through this pool instead of opening a
+connection per statement. Connections are created lazily, kept open and
+handed out to one thread at a time; each one is configured once with WAL
+journaling, a busy timeout and a statement cache, so repeated queries reuse
+their prepared statements.
+"""
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_NAME = os.environ.get("WUZZLE_DB", "wuzzle_users.db")
+POOL_SIZE = 8
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE_SIZE = 256
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8192",
+    "PRAGMA mmap_size=67108864",
+)
+
+
+class ConnectionPool:
+    def __init__(self, path, size=POOL_SIZE, pragmas=PRAGMAS):
+        self.path = path
+        self.size = size
+        self.pragmas = pragmas
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._all = []
+
+    def _connect(self):
+        # isolation_level=None: statements autocommit unless run inside
+        # transaction(), which issues its own BEGIN IMMEDIATE / COMMIT.
+        conn = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self, timeout=None):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._all) < self.size:
+                conn = self._connect()
+                self._all.append(conn)
+                return conn
+
+        return self._idle.get(timeout=timeout)
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close(self):
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all = []
+            self._idle = queue.LifoQueue()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_NAME)
+    return _pool
+
+
+def configure(path=None, size=POOL_SIZE, pragmas=PRAGMAS):
+    """Point the shared pool at another database file (e.g. a temp DB for load tests)"""
+    global _pool, DB_NAME
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        DB_NAME = path or DB_NAME
+        _pool = ConnectionPool(DB_NAME, size, pragmas)
+    return _pool
+
+
+@contextmanager
+def connection():
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+@contextmanager
+def transaction():
+    """Connection with an open write transaction, committed on success"""
+    with connection() as conn:
+        # IMMEDIATE takes the write lock up front, so concurrent writers wait
+        # on busy_timeout instead of failing on a lock upgrade.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def execute(sql, params=()):
+    """Run one write statement in its own transaction and return the row count"""
+    with transaction() as conn:
+        return conn.execute(sql, params).rowcount
+
+
+def fetchone(sql, params=()):
+    with connection() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def fetchall(sql, params=()):
+    with connection() as conn:
+        return conn.execute(sql, params).fetchall()
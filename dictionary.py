@@ -0,0 +1,121 @@
+"""Dictionary loading for WordGenerator and the solver tools.
+
+The game only needs the words of one length (4 to 8 letters, five by
+default) from the NLTK ``words`` corpus, so each length is extracted once
+into its own packed artifact (fixed-width ASCII records) that later
+processes read in one go instead of parsing the whole corpus:
+
+    python dictionary.py build                 # download NLTK words and pack them
+    python dictionary.py build --length 6      # six-letter words instead
+    python dictionary.py build --source my.txt # pack a local word file instead
+
+A local word file (one word per line) can also be used directly by passing
+``word_file`` or setting ``WUZZLE_WORDS``.
+"""
+import argparse
+import os
+
+from pattern_matrix import CACHE_DIR
+
+WORD_LENGTH = 5
+LENGTHS = range(4, 9)
+WORDS_ENV = "WUZZLE_WORDS"
+
+
+def artifact_path(cache_dir=CACHE_DIR, length=WORD_LENGTH):
+    return os.path.join(cache_dir, f"words{length}.bin")
+
+
+def filter_words(words, length=WORD_LENGTH):
+    """Uppercase alphabetic words of the given length, deduplicated in first-seen order"""
+    seen = set()
+    result = []
+    for word in words:
+        word = word.strip()
+        if len(word) == length and word.isalpha() and word.isascii():
+            word = word.upper()
+            if word not in seen:
+                seen.add(word)
+                result.append(word)
+    return result
+
+
+def read_word_file(path, length=WORD_LENGTH):
+    with open(path, encoding="utf-8") as f:
+        return filter_words(f, length)
+
+
+def nltk_words(download=False, length=WORD_LENGTH):
+    import nltk
+    from nltk.corpus import words as nltk_corpus
+
+    if download:
+        nltk.download('words')
+    return filter_words(nltk_corpus.words(), length)
+
+
+def write_artifact(words, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write("".join(words).encode("ascii"))
+    os.replace(tmp_path, path)
+
+
+def read_artifact(path, length=WORD_LENGTH):
+    with open(path, "rb") as f:
+        text = f.read().decode("ascii")
+    return [text[i:i + length] for i in range(0, len(text), length)]
+
+
+def build(source="nltk", path=None, length=WORD_LENGTH):
+    """Explicit build step: the only place the NLTK corpus is downloaded"""
+    if source == "nltk":
+        words = nltk_words(download=True, length=length)
+    else:
+        words = read_word_file(source, length)
+    path = path or artifact_path(length=length)
+    write_artifact(words, path)
+    return path, words
+
+
+def load_words(word_file=None, length=WORD_LENGTH):
+    """Load the dictionary without touching the network.
+
+    Order of precedence: an explicit ``word_file``, the ``WUZZLE_WORDS``
+    environment variable, the packed artifact, and finally an already
+    downloaded NLTK corpus (which is packed for next time).
+    """
+    word_file = word_file or os.environ.get(WORDS_ENV)
+    if word_file:
+        return read_word_file(word_file, length)
+
+    path = artifact_path(length=length)
+    if os.path.exists(path):
+        return read_artifact(path, length)
+
+    try:
+        words = nltk_words(length=length)
+    except (ImportError, LookupError):
+        raise FileNotFoundError(
+            f"No dictionary found at {path}. Run 'python dictionary.py build' "
+            f"or set {WORDS_ENV} to a local word file."
+        ) from None
+    write_artifact(words, path)
+    return words
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the packed dictionary artifact")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--source", default="nltk", help="'nltk' or a local word file, one word per line")
+    parser.add_argument("--length", type=int, default=WORD_LENGTH, choices=LENGTHS)
+    parser.add_argument("--out", help="artifact path (default: .cache/words<length>.bin)")
+    args = parser.parse_args()
+
+    path, words = build(args.source, args.out, args.length)
+    print(f"Packed {len(words)} words into {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""Headless Wuzzle engine: many concurrent games addressed by ID.
+
+Games live in one in-process store, ordered by last use, so idle games are
+evicted from the front in O(1) once they pass ``ttl`` or the store is over
+``max_games``. Finished games stay readable until then, and their results
+are handed to a background thread that commits them with
+``record_game_result``; callers never wait on SQLite. The same
+engine backs ``python engine.py serve``, a small asyncio JSON-over-HTTP
+front-end.
+"""
+import atexit
+import logging
+import queue
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from dictionary import LENGTHS, WORD_LENGTH
+from logic import MAX_ATTEMPTS, Wuzzle
+from scoring import labels, solved_pattern
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 30 * 60
+MAX_GAMES = 100000
+MAX_RESULT_QUEUE = 10000
+
+
+class GameSession:
+    __slots__ = ("game", "username", "touched")
+
+    def __init__(self, game, username, touched):
+        self.game = game
+        self.username = username
+        self.touched = touched
+
+
+class ResultWriter:
+    """Background committer for finished games (see archive.ArchiveWriter)"""
+
+    _STOP = object()
+
+    def __init__(self, max_queue=MAX_RESULT_QUEUE, retries=3):
+        self.retries = retries
+        self.written = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="engine-results", daemon=True)
+        self._thread.start()
+
+    def submit(self, username, won, guesses, word):
+        self._queue.put((username, won, list(guesses), word))
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _run(self):
+        from user_manager import record_game_result
+
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                self._queue.task_done()
+                return
+            for attempt in range(self.retries + 1):
+                try:
+                    record_game_result(*item)
+                    self.written += 1
+                    break
+                except Exception:
+                    if attempt == self.retries:
+                        self.failed += 1
+                        logger.exception("Dropping result for %s after %d attempts", item[0], attempt + 1)
+                    else:
+                        time.sleep(0.05 * 2 ** attempt)
+            self._queue.task_done()
+
+
+class GameEngine:
+    """Create, play and evict Wuzzle games by ID.
+
+    ``words`` pins the engine to one WordGenerator; by default each game
+    draws from the shared dictionary of the length it asks for. Games for a
+    registered ``username`` have their guesses archived and their result
+    recorded; the engine does not authenticate, so it only checks that the
+    account exists. Games for unknown users, and every game when
+    ``record`` is False, are anonymous and never touch the database.
+    Unknown or evicted IDs raise KeyError, bad guesses raise ValueError.
+    """
+
+    def __init__(self, words=None, ttl=DEFAULT_TTL, max_games=MAX_GAMES, strict=False, record=True):
+        self.words = words
+        self.ttl = ttl
+        self.max_games = max_games
+        self.strict = strict
+        self.created = 0
+        self.finished = 0
+        self.evicted = 0
+        self._games = OrderedDict()
+        self._lock = threading.Lock()
+        self._results = None
+        if record:
+            from schema import ensure_schema
+            ensure_schema()
+            self._results = ResultWriter()
+
+    def __len__(self):
+        return len(self._games)
+
+    def words_for(self, length=WORD_LENGTH):
+        if self.words is not None:
+            if length != self.words.word_length:
+                raise ValueError(f"This engine only plays {self.words.word_length}-letter games")
+            return self.words
+        if length not in LENGTHS:
+            raise ValueError(f"Word length must be between {LENGTHS[0]} and {LENGTHS[-1]}")
+        from resources import shared_word_generator
+        return shared_word_generator(length=length)
+
+    def new_game(self, username=None, secret=None, length=None, max_attempts=MAX_ATTEMPTS):
+        """Start a game and return its ID"""
+        if secret is None:
+            if length is None:
+                length = self.words.word_length if self.words is not None else WORD_LENGTH
+            secret = self.words_for(length).generate_word()
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        if username and not self._is_registered(username):
+            username = None
+        game_id = secrets.token_urlsafe(9)
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            self._games[game_id] = GameSession(Wuzzle(secret, max_attempts), username, now)
+            self.created += 1
+            if len(self._games) > self.max_games:
+                self._games.popitem(last=False)
+                self.evicted += 1
+        return game_id
+
+    def guess(self, game_id, word):
+        """Play one guess; returns the same dict as ``state`` plus this guess's feedback"""
+        word = word.upper()
+        with self._lock:
+            session = self._touch(game_id)
+            game = session.game
+            if not game.can_attempt():
+                raise ValueError("Game is already over")
+            if len(word) != game.max_word_length or not word.isalpha():
+                raise ValueError(f"Guess must be {game.max_word_length} letters")
+            if self.strict and not self.words_for(len(word)).is_valid_word(word):
+                raise ValueError(f"{word} is not in the dictionary")
+
+            game.attempt(word)
+            pattern = game.score(word)
+            over = not game.can_attempt()
+            if over:
+                self.finished += 1
+
+        if session.username:
+            from archive import archive_guess
+            archive_guess(session.username, word, game.secret)
+            if over and self._results is not None:
+                self._results.submit(session.username, game.is_solved(), game.attempts, game.secret)
+
+        result = self._describe(game_id, session)
+        result.update(
+            pattern=pattern,
+            feedback=labels(pattern, len(word)),
+            solved=pattern == solved_pattern(len(word)),
+        )
+        return result
+
+    def state(self, game_id):
+        with self._lock:
+            session = self._touch(game_id)
+        return self._describe(game_id, session)
+
+    def evict_expired(self):
+        with self._lock:
+            return self._evict(time.monotonic())
+
+    def stats(self):
+        return {
+            "active": len(self._games),
+            "created": self.created,
+            "finished": self.finished,
+            "evicted": self.evicted,
+            "results_written": self._results.written if self._results else 0,
+            "results_failed": self._results.failed if self._results else 0,
+        }
+
+    def close(self):
+        """Commit every queued result"""
+        if self._results is not None:
+            self._results.close()
+            self._results = None
+
+    def _is_registered(self, username):
+        if self._results is None:
+            return False
+        from user_manager import user_exists
+        return user_exists(username)
+
+    def _touch(self, game_id):
+        now = time.monotonic()
+        self._evict(now)
+        session = self._games[game_id]
+        session.touched = now
+        self._games.move_to_end(game_id)
+        return session
+
+    def _evict(self, now):
+        # Oldest-touched first, so stop at the first game still inside its TTL.
+        count = 0
+        cutoff = now - self.ttl
+        while self._games:
+            game_id, session = next(iter(self._games.items()))
+            if session.touched > cutoff:
+                break
+            self._games.popitem(last=False)
+            count += 1
+        self.evicted += count
+        return count
+
+    @staticmethod
+    def _describe(game_id, session):
+        game = session.game
+        over = not game.can_attempt()
+        return {
+            "id": game_id,
+            "username": session.username,
+            "attempts": list(game.attempts),
+            "length": game.max_word_length,
+            "remaining": game.remaining_attempts(),
+            "over": over,
+            "won": game.is_solved(),
+            "secret": game.secret if over else None,
+        }
+
+
+async def serve(engine, host="127.0.0.1", port=8765, sweep_interval=30):
+    """Serve the engine over HTTP/1.1 with JSON bodies.
+
+    POST /games {"username"?, "length"?, "max_attempts"?}
+                                      -> new game state
+    GET  /games/<id>                  -> game state
+    POST /games/<id>/guess {"word"}   -> state plus feedback
+    GET  /stats                       -> engine counters
+    """
+    import asyncio
+    import json
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                raw = await reader.readexactly(length) if length else b""
+
+                # Engine calls can block (archive/result queues, building a
+                # dictionary), so keep them off the event loop.
+                status, payload = await loop.run_in_executor(None, respond, method, path.rstrip("/"), raw)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def respond(method, path, raw):
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            return "400 Bad Request", {"error": "Request body is not valid JSON"}
+        if not isinstance(body, dict):
+            return "400 Bad Request", {"error": "Request body must be a JSON object"}
+
+        try:
+            return route(method, path, body)
+        except KeyError:
+            return "404 Not Found", {"error": "Unknown or expired game"}
+        except (ValueError, TypeError) as e:
+            return "400 Bad Request", {"error": str(e)}
+        except OSError as e:
+            # e.g. no dictionary artifact built for the requested word length
+            logger.error("Cannot serve %s %s: %s", method, path, e)
+            return "503 Service Unavailable", {"error": str(e)}
+        except Exception:
+            logger.exception("Error serving %s %s", method, path)
+            return "500 Internal Server Error", {"error": "Internal server error"}
+
+    def route(method, path, body):
+        parts = path.strip("/").split("/")
+        if method == "POST" and parts == ["games"]:
+            username = body.get("username")
+            if username is not None and not isinstance(username, str):
+                raise TypeError("username must be a string")
+            game_id = engine.new_game(
+                username=username,
+                length=int(body.get("length", WORD_LENGTH)),
+                max_attempts=int(body.get("max_attempts", MAX_ATTEMPTS)),
+            )
+            return "201 Created", engine.state(game_id)
+        if method == "GET" and parts == ["stats"]:
+            return "200 OK", engine.stats()
+        if len(parts) == 2 and parts[0] == "games" and method == "GET":
+            return "200 OK", engine.state(parts[1])
+        if len(parts) == 3 and parts[0] == "games" and parts[2] == "guess" and method == "POST":
+            word = body.get("word", "")
+            if not isinstance(word, str):
+                raise TypeError("word must be a string")
+            return "200 OK", engine.guess(parts[1], word)
+        return "404 Not Found", {"error": "Not found"}
+
+    async def sweep():
+        while True:
+            await asyncio.sleep(sweep_interval)
+            await loop.run_in_executor(None, engine.evict_expired)
+
+    loop = asyncio.get_running_loop()
+    server = await asyncio.start_server(handle, host, port)
+    sweeper = asyncio.create_task(sweep())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        sweeper.cancel()
+
+
+def capacity(n=50000, words=None):
+    """Create ``n`` games with one guess each; returns bytes per game and games/s"""
+    import tracemalloc
+
+    engine = GameEngine(words, max_games=n, record=False)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    started = time.perf_counter()
+    for _ in range(n):
+        engine.guess(engine.new_game(), "CRANE")
+    elapsed = time.perf_counter() - started
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    used = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return {"games": len(engine), "bytes_per_game": used / n, "games_per_second": n / elapsed}
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(description="Headless Wuzzle game engine")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_cmd = commands.add_parser("serve", help="run the JSON/HTTP front-end")
+    serve_cmd.add_argument("--host", default="127.0.0.1")
+    serve_cmd.add_argument("--port", type=int, default=8765)
+    serve_cmd.add_argument("--ttl", type=float, default=DEFAULT_TTL, help="seconds before an idle game is evicted")
+    serve_cmd.add_argument("--max-games", type=int, default=MAX_GAMES)
+    serve_cmd.add_argument("--strict", action="store_true", help="reject guesses that are not dictionary words")
+
+    capacity_cmd = commands.add_parser("capacity", help="measure memory and setup cost per game")
+    capacity_cmd.add_argument("-n", type=int, default=50000)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        engine = GameEngine(ttl=args.ttl, max_games=args.max_games, strict=args.strict)
+        atexit.register(engine.close)
+        print(f"Serving Wuzzle games on http://{args.host}:{args.port}")
+        try:
+            asyncio.run(serve(engine, args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        result = capacity(args.n)
+        print(f"{result['games']} games, {result['bytes_per_game']:.0f} bytes/game, "
+              f"{result['games_per_second']:,.0f} games/s")
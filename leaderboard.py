@@ -0,0 +1,91 @@
+"""Leaderboard reads and writes.
+
+Ranking happens in SQL against an index on ``(score DESC, username)``: the
+top-N is an index range scan and a player's exact rank is the number of rows
+ahead of them. The top-N is cached in-process for a few seconds and dropped
+whenever this process writes to the leaderboard, so a busy leaderboard tab
+does not query SQLite on every rerun.
+"""
+import threading
+import time
+
+import db
+import metrics
+
+CACHE_TTL = 5.0
+CACHE_ROWS = 50
+
+_cache_lock = threading.Lock()
+_cache = {'rows': None, 'expires': 0.0}
+
+
+def invalidate_cache():
+    with _cache_lock:
+        _cache['rows'] = None
+
+
+def score_for(won):
+    # Calculate score - simple version: 10 points per win, 1 point for playing
+    return 10 if won else 1
+
+
+UPSERT_RESULT = """
+    INSERT INTO leaderboard (username, games_played, games_won, score, last_update)
+    VALUES (?, 1, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(username) DO UPDATE SET
+        games_played = games_played + 1,
+        games_won = games_won + excluded.games_won,
+        score = score + excluded.score,
+        last_update = CURRENT_TIMESTAMP
+"""
+
+
+def upsert_result(conn, username, won):
+    """Add one game to a player's leaderboard row inside the caller's transaction"""
+    conn.execute(UPSERT_RESULT, (username, 1 if won else 0, score_for(won)))
+
+
+def update_leaderboard(username, won=False):
+    """Update the leaderboard after a game"""
+    with db.transaction() as conn:
+        upsert_result(conn, username, won)
+
+    invalidate_cache()
+
+
+@metrics.timed("db.get_leaderboard")
+def get_leaderboard(limit=10):
+    """Get top users by score, served from the short-lived cache when possible"""
+    if limit <= CACHE_ROWS:
+        with _cache_lock:
+            rows = _cache['rows']
+            if rows is not None and time.monotonic() < _cache['expires']:
+                metrics.increment("leaderboard.cache_hits")
+                return rows[:limit]
+
+    rows = db.fetchall("""
+        SELECT username, games_played, games_won, score, last_update
+        FROM leaderboard
+        ORDER BY score DESC, username
+        LIMIT ?
+    """, (max(limit, CACHE_ROWS),))
+
+    with _cache_lock:
+        _cache['rows'] = rows[:CACHE_ROWS]
+        _cache['expires'] = time.monotonic() + CACHE_TTL
+    return rows[:limit]
+
+
+def get_user_rank(username):
+    """(rank, total players) for any user on the leaderboard, or None.
+
+    Ties are broken by username, matching the order of get_leaderboard.
+    """
+    return db.fetchone("""
+        SELECT 1 + (SELECT COUNT(*) FROM leaderboard AS ahead
+                    WHERE ahead.score > me.score
+                       OR (ahead.score = me.score AND ahead.username < me.username)),
+               (SELECT COUNT(*) FROM leaderboard)
+        FROM leaderboard AS me
+        WHERE me.username = ?
+    """, (username,))
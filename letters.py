@@ -1,4 +1,9 @@
+from scoring import CORRECT, PRESENT, digits
+
+
 class Letter_state:
+    __slots__ = ("character", "in_word", "in_position")
+
     def __init__(self, character: str):
         self.character: str = character
         self.in_word: bool = False
@@ -7,3 +12,14 @@ class Letter_state:
     def __repr__(self):
         status = f"{self.character} - In Word: {self.in_word}, In Position: {self.in_position}"
         return status
+
+
+def letter_states(word: str, pattern: int):
+    """Letter_state view of a packed feedback pattern, built only for rendering"""
+    result = []
+    for character, digit in zip(word, digits(pattern, len(word))):
+        state = Letter_state(character)
+        state.in_position = digit == CORRECT
+        state.in_word = digit in (CORRECT, PRESENT)
+        result.append(state)
+    return result
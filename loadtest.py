@@ -0,0 +1,221 @@
+"""Concurrent-player load test against a throwaway SQLite database.
+
+Each simulated player signs up once, then plays games the way the app
+does: log in, six scored guesses archived one by one, commit the result,
+read the leaderboard. Players run as threads (sharing one connection pool,
+like Streamlit sessions in one server) or as processes (one pool each,
+like several server processes on one database file).
+
+Guesses are archived synchronously by default, so ``archive_guess`` is a
+real database write under each storage config. With ``--write-behind`` it
+only times the queue submit; the report then adds the background writer's
+own counts and batch timings, which is where database errors show up.
+
+    python loadtest.py --players 16 --games 20 --config wal --config delete
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import archive
+import db
+from batch_solve import percentile
+from dictionary import load_words
+from leaderboard import get_leaderboard
+from logic import Wuzzle
+from schema import ensure_schema
+from user_manager import authenticate_user, create_user, record_game_result
+
+OPERATIONS = ("login", "guess", "archive_guess", "record_game_result", "get_leaderboard")
+
+CONFIGS = {
+    "wal": db.PRAGMAS,
+    "wal-full": tuple(p for p in db.PRAGMAS if "synchronous" not in p) + ("PRAGMA synchronous=FULL",),
+    "delete": tuple(p for p in db.PRAGMAS if "journal_mode" not in p and "synchronous" not in p)
+              + ("PRAGMA journal_mode=DELETE", "PRAGMA synchronous=FULL"),
+}
+
+
+def _is_lock_error(exc):
+    return isinstance(exc, sqlite3.OperationalError) and ("locked" in str(exc) or "busy" in str(exc))
+
+
+def _timed(timings, errors, name, fn, *args):
+    started = time.perf_counter()
+    try:
+        return fn(*args)
+    except Exception as e:
+        errors["lock" if _is_lock_error(e) else "other"][name] += 1
+        return None
+    finally:
+        timings[name].append(time.perf_counter() - started)
+
+
+def _init_process(path, pragmas, pool_size):
+    db.configure(path, pool_size, pragmas)
+    ensure_schema()
+
+
+def play(player, words, games, seed, write_behind=False):
+    """One player's session; returns (per-operation latencies, lock and other errors, writer stats)"""
+    rng = random.Random(seed)
+    username = f"load_{player}"
+    password = "secret"
+    timings = defaultdict(list)
+    errors = {"lock": defaultdict(int), "other": defaultdict(int)}
+    archive_fn = archive.archive_guess if write_behind else archive.archive_guess_sync
+
+    create_user(username, password)
+    for _ in range(games):
+        _timed(timings, errors, "login", authenticate_user, username, password)
+        game = Wuzzle(rng.choice(words))
+        while game.can_attempt():
+            word = rng.choice(words) if game.remaining_attempts() > 1 else game.secret
+            game.attempt(word)
+            _timed(timings, errors, "guess", game.score, word)
+            _timed(timings, errors, "archive_guess", archive_fn, username, word, game.secret)
+        _timed(timings, errors, "record_game_result", record_game_result,
+               username, game.is_solved(), game.attempts, game.secret)
+        _timed(timings, errors, "get_leaderboard", get_leaderboard)
+
+    writer_stats = None
+    if write_behind:
+        writer = archive.get_writer()
+        writer.flush()
+        # Cumulative for this process's writer, so the caller keeps the latest per pid.
+        writer_stats = dict(writer.stats(), pid=os.getpid())
+    return dict(timings), {kind: dict(counts) for kind, counts in errors.items()}, writer_stats
+
+
+def run(config="wal", players=8, games=10, mode="threads", pool_size=db.POOL_SIZE,
+        write_behind=False, words=None, seed=0, path=None):
+    """Run one load test and return a summary dict"""
+    words = words or load_words()
+    pragmas = CONFIGS[config]
+    path = path or os.path.join(tempfile.mkdtemp(prefix="wuzzle_load_"), "load.db")
+    _init_process(path, pragmas, pool_size)
+
+    if mode == "threads":
+        executor = ThreadPoolExecutor(max_workers=players)
+    else:
+        import multiprocessing
+        executor = ProcessPoolExecutor(
+            max_workers=players,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_process,
+            initargs=(path, pragmas, pool_size),
+        )
+
+    started = time.perf_counter()
+    with executor:
+        futures = [executor.submit(play, player, words, games, seed + player, write_behind)
+                   for player in range(players)]
+        outcomes = [future.result() for future in futures]
+    writers = {}
+    if mode == "threads" and write_behind:
+        writer = archive.get_writer()
+        archive.close_writer()
+        writers[os.getpid()] = writer.stats()
+    elapsed = time.perf_counter() - started
+
+    timings = defaultdict(list)
+    errors = {"lock": defaultdict(int), "other": defaultdict(int)}
+    for player_timings, player_errors, writer_stats in outcomes:
+        if writer_stats and mode == "processes":
+            # Counters only grow, so the largest of each is that process's total.
+            pid = writer_stats.pop("pid")
+            previous = writers.get(pid, {})
+            writers[pid] = {key: max(value, previous.get(key, 0)) for key, value in writer_stats.items()}
+        for name, values in player_timings.items():
+            timings[name].extend(values)
+        for kind, counts in player_errors.items():
+            for name, count in counts.items():
+                errors[kind][name] += count
+
+    operations = {}
+    for name in OPERATIONS:
+        values = timings.get(name, [])
+        operations[name] = {
+            "count": len(values),
+            "per_second": len(values) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "lock_errors": errors["lock"].get(name, 0),
+            "other_errors": errors["other"].get(name, 0),
+        }
+
+    archive_writer = None
+    if write_behind:
+        archive_writer = {key: sum(w[key] for w in writers.values())
+                          for key in ("written", "failed", "batches", "write_seconds")}
+        batches = archive_writer["batches"]
+        archive_writer["mean_batch_ms"] = archive_writer["write_seconds"] / batches * 1000 if batches else 0.0
+
+    return {
+        "config": config,
+        "mode": mode,
+        "players": players,
+        "games_per_player": games,
+        "pool_size": pool_size,
+        "write_behind": write_behind,
+        "archive_writer": archive_writer,
+        "database": path,
+        "elapsed_s": elapsed,
+        "games_per_second": players * games / elapsed if elapsed else 0.0,
+        "operations": operations,
+    }
+
+
+def print_report(result):
+    print(f"\n{result['config']} ({result['mode']}, {result['players']} players x "
+          f"{result['games_per_player']} games, pool {result['pool_size']}"
+          f"{', write-behind archive' if result['write_behind'] else ''}): "
+          f"{result['games_per_second']:.1f} games/s in {result['elapsed_s']:.2f}s")
+    print(f"  {'operation':<20}{'count':>8}{'ops/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'locks':>7}{'errors':>8}")
+    for name, op in result["operations"].items():
+        print(f"  {name:<20}{op['count']:>8}{op['per_second']:>10.0f}{op['p50_ms']:>9.2f}"
+              f"{op['p95_ms']:>9.2f}{op['p99_ms']:>9.2f}{op['lock_errors']:>7}{op['other_errors']:>8}")
+    writer = result["archive_writer"]
+    if writer:
+        print("  archive_guess above times the queue submit only; the background writer did:")
+        print(f"  {'archive writer':<20}{writer['written']:>8} written, {writer['failed']} failed, "
+              f"{writer['batches']} batches, {writer['mean_batch_ms']:.2f} ms mean batch")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent Wuzzle players against a temp database")
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--games", type=int, default=10, help="games per player")
+    parser.add_argument("--mode", choices=["threads", "processes"], default="threads")
+    parser.add_argument("--config", action="append", choices=sorted(CONFIGS),
+                        help="storage configuration to test; repeat to compare (default: wal)")
+    parser.add_argument("--pool-size", type=int, default=db.POOL_SIZE)
+    parser.add_argument("--write-behind", action="store_true",
+                        help="archive guesses through the write-behind queue instead of synchronously")
+    parser.add_argument("--words", help="word list file (default: the configured dictionary)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    words = load_words(args.words)
+    results = []
+    for config in args.config or ["wal"]:
+        result = run(config, args.players, args.games, args.mode, args.pool_size,
+                     args.write_behind, words, args.seed)
+        print_report(result)
+        results.append(result)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,19 @@
-from letters import Letter_state
-from collections import defaultdict
+from letters import letter_states
+from scoring import score
+MAX_ATTEMPTS = 6
+
+
 class Wuzzle:
-    max_word_length=5
-    max_attempts=6
+    __slots__ = ("secret", "attempts", "max_attempts")
 
-    def __init__(self, secret: str):
+    def __init__(self, secret: str, max_attempts: int = MAX_ATTEMPTS):
         self.secret: str=secret.upper()
         self.attempts=[]
+        self.max_attempts=max_attempts
+
+    @property
+    def max_word_length(self):
+        return len(self.secret)
 
     def is_solved(self):
         return bool(self.attempts) and self.attempts[-1]==self.secret
@@ -14,29 +21,13 @@ class Wuzzle:
     def attempt(self, word: str):
         self.attempts.append(word.upper())
 
+    def score(self, word: str) -> int:
+        """Packed feedback pattern for a guess, see scoring.score"""
+        return score(word.upper(), self.secret)
+
     def guess(self, word: str):
         word = word.upper()
-        result = []
-        secret_counts = defaultdict(int)
-
-        for ch in self.secret:
-            secret_counts[ch] += 1
-
-        for i in range(self.max_word_length):
-            result.append(Letter_state(word[i]))
-
-        for i in range(self.max_word_length):
-            if word[i] == self.secret[i]:
-                result[i].in_position = True
-                result[i].in_word = True
-                secret_counts[word[i]] -= 1
-
-        for i in range(self.max_word_length):
-            if not result[i].in_position and secret_counts[word[i]] > 0:
-                result[i].in_word = True
-                secret_counts[word[i]] -= 1
-
-        return result
+        return letter_states(word, score(word, self.secret))
 
     def remaining_attempts(self):
         return self.max_attempts - len(self.attempts)
@@ -0,0 +1,200 @@
+"""In-process counters, timers and histograms.
+
+Instrumentation is off unless ``WUZZLE_METRICS=1`` is set when this module
+is first imported. While it is off, ``timed`` hands back the undecorated
+function and ``timer`` returns a shared no-op context manager, so hot paths
+pay nothing. When it is on, timings go into fixed-bucket histograms that
+can be shown in the app's admin panel or exported periodically, as
+Prometheus text (``.prom``) or JSON lines (anything else), to
+``WUZZLE_METRICS_FILE``.
+"""
+import bisect
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("WUZZLE_METRICS", "") not in ("", "0")
+METRICS_FILE = os.environ.get("WUZZLE_METRICS_FILE")
+EXPORT_INTERVAL = float(os.environ.get("WUZZLE_METRICS_INTERVAL", 60))
+ADMINS = frozenset(name.strip() for name in os.environ.get("WUZZLE_ADMINS", "").split(",") if name.strip())
+
+# Upper bounds in seconds, from 100us to 10s.
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULL = contextlib.nullcontext()
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max
+
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+
+
+def is_admin(username):
+    return username in ADMINS
+
+
+def increment(name, value=1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name, value):
+    if not ENABLED:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(value)
+
+
+class _Timer:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def timer(name):
+    """Context manager recording the block's duration under ``name``"""
+    return _Timer(name) if ENABLED else _NULL
+
+
+def timed(name):
+    """Decorator recording each call's duration under ``name``"""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+def snapshot():
+    """Plain-dict copy of every counter and histogram"""
+    with _lock:
+        return {
+            "timestamp": time.time(),
+            "counters": dict(_counters),
+            "timers": {
+                name: {
+                    "count": h.count,
+                    "sum": h.total,
+                    "max": h.max,
+                    "p50": h.quantile(0.5),
+                    "p95": h.quantile(0.95),
+                    "p99": h.quantile(0.99),
+                    "buckets": list(h.counts),
+                }
+                for name, h in _histograms.items()
+            },
+        }
+
+
+def _metric_name(name):
+    return "wuzzle_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+def prometheus_text(snap=None):
+    snap = snap or snapshot()
+    lines = []
+    for name, value in sorted(snap["counters"].items()):
+        metric = _metric_name(name) + "_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for name, timer_snap in sorted(snap["timers"].items()):
+        metric = _metric_name(name) + "_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, count in zip(BUCKETS, timer_snap["buckets"]):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{le="+Inf"}} {timer_snap["count"]}')
+        lines.append(f"{metric}_sum {timer_snap['sum']}")
+        lines.append(f"{metric}_count {timer_snap['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_snapshot(path=None):
+    """Write the current metrics: ``.prom`` files are replaced, anything else gets a JSON line appended"""
+    path = path or METRICS_FILE
+    snap = snapshot()
+    if path.endswith(".prom"):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(prometheus_text(snap))
+        os.replace(tmp, path)
+    else:
+        with open(path, "a") as f:
+            f.write(json.dumps(snap) + "\n")
+
+
+_exporter = None
+
+
+def start_exporter(path=None, interval=EXPORT_INTERVAL):
+    """Write snapshots every ``interval`` seconds from a daemon thread; no-op if disabled or already running"""
+    global _exporter
+    path = path or METRICS_FILE
+    if not ENABLED or not path:
+        return None
+    with _lock:
+        if _exporter is not None:
+            return _exporter
+
+        def run():
+            while True:
+                time.sleep(interval)
+                write_snapshot(path)
+
+        _exporter = threading.Thread(target=run, name="metrics-exporter", daemon=True)
+        _exporter.start()
+        return _exporter
@@ -0,0 +1,127 @@
+"""Precomputed solver decision tree ("opening book").
+
+Given a dictionary and strategy the solver is deterministic, so every move it
+can make is a function of the feedback seen so far. ``build_book`` walks that
+tree once and records ``feedback history -> (guess, explanation)``; an
+``AISolver`` constructed with the book answers each move with a dict lookup.
+
+    python opening_book.py --words words.txt --strategy minimax
+"""
+import argparse
+import gzip
+import json
+import os
+
+from ai_solver import AISolver, STRATEGIES
+from dictionary import LENGTHS, WORD_LENGTH, load_words
+from logic import MAX_ATTEMPTS
+from pattern_matrix import CACHE_DIR, word_list_hash
+from scoring import pack, pattern_key, solved_pattern
+
+BOOK_VERSION = 2
+
+
+def default_path(words, strategy, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"book_v{BOOK_VERSION}_{strategy}_{word_list_hash(words)}.json.gz")
+
+
+class OpeningBook:
+    def __init__(self, dictionary_hash, strategy, moves):
+        self.dictionary_hash = dictionary_hash
+        self.strategy = strategy
+        # feedback_key -> [guess, explanation]; a key is the fixed-width hex
+        # packed feedback of every earlier move, "" for the first move.
+        self.moves = moves
+
+    def matches(self, words, strategy):
+        return self.strategy == strategy and self.dictionary_hash == word_list_hash(words)
+
+    def lookup(self, feedback_key):
+        move = self.moves.get(feedback_key)
+        return tuple(move) if move is not None else None
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        data = {
+            'version': BOOK_VERSION,
+            'dictionary_hash': self.dictionary_hash,
+            'strategy': self.strategy,
+            'moves': self.moves,
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a book, or None if the file is missing or from another book version"""
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get('version') != BOOK_VERSION:
+            return None
+        return cls(data['dictionary_hash'], data['strategy'], data['moves'])
+
+    @classmethod
+    def load_for(cls, words, strategy="minimax", cache_dir=CACHE_DIR):
+        """Load the cached book for this dictionary and strategy, if one has been built"""
+        book = cls.load(default_path(words, strategy, cache_dir))
+        if book is None or not book.matches(words, strategy):
+            return None
+        return book
+
+
+def build_book(words, strategy="minimax", max_moves=MAX_ATTEMPTS, **solver_kwargs):
+    """Replay the live solver over every reachable feedback history"""
+    solver = AISolver(words, strategy=strategy, **solver_kwargs)
+    moves = {}
+
+    def visit(feedback_key, possible_words, guess_history):
+        solver.possible_words = possible_words
+        solver.guess_history = list(guess_history)
+        guess, explanation = solver._select_guess_with_explanation()
+        moves[feedback_key] = [guess, explanation]
+
+        if len(guess_history) + 1 >= max_moves:
+            return
+
+        feedback_by_pattern = {}
+        for secret in possible_words:
+            feedback = solver._get_feedback(guess, secret)
+            feedback_by_pattern.setdefault(pack(feedback), feedback)
+
+        for pattern, feedback in feedback_by_pattern.items():
+            if pattern == solved_pattern(len(guess)):
+                continue
+            # Use the solver's own filter so the book reproduces live play exactly.
+            solver.possible_words = possible_words
+            solver.guess_history = list(guess_history)
+            solver._apply_constraints(guess, feedback)
+            if solver.possible_words:
+                visit(feedback_key + pattern_key(pattern, len(guess)), solver.possible_words, guess_history + [guess])
+
+    solver.reset()
+    visit("", solver.possible_words, [])
+    return OpeningBook(word_list_hash(words), strategy, moves)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the solver's decision tree for a dictionary")
+    parser.add_argument("--words", help="word list file, one word per line (default: packed dictionary)")
+    parser.add_argument("--strategy", default="minimax", choices=STRATEGIES)
+    parser.add_argument("--length", type=int, default=WORD_LENGTH, choices=LENGTHS)
+    parser.add_argument("--out", help="output path (default: keyed by dictionary hash under .cache/)")
+    args = parser.parse_args()
+
+    words = load_words(args.words, args.length)
+
+    book = build_book(words, args.strategy)
+    path = args.out or default_path(words, args.strategy)
+    book.save(path)
+    print(f"Wrote {len(book.moves)} positions to {path} ({os.path.getsize(path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import hashlib
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from scoring import encode_words, num_patterns, score_block
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+CACHE_VERSION = 1
+
+def word_list_hash(words):
+    """Stable short hash of a word list, used to key on-disk caches"""
+    digest = hashlib.sha1()
+    for word in words:
+        digest.update(word.encode("ascii"))
+        digest.update(b"\n")
+    return digest.hexdigest()[:16]
+
+
+def build_matrix(words, chunk_size=256):
+    """Compute the full guess x secret pattern matrix in chunks of guesses"""
+    codes = encode_words(words)
+    dtype = np.uint8 if codes.shape[1] <= 5 else np.uint16
+    matrix = np.empty((len(words), len(words)), dtype=dtype)
+    for start in range(0, len(words), chunk_size):
+        stop = min(start + chunk_size, len(words))
+        matrix[start:stop] = score_block(codes[start:stop], codes)
+    return matrix
+
+
+class PatternMatrix:
+    """Precomputed feedback pattern for every guess/secret pair of a word list.
+
+    Row ``i``, column ``j`` holds the packed ``scoring.score`` pattern of
+    guessing ``words[i]`` when the secret is ``words[j]``. The matrix is cached on disk keyed by a
+    hash of the word list and memory-mapped on later loads.
+    """
+
+    def __init__(self, words, cache_dir=CACHE_DIR):
+        if np is None:
+            raise ImportError("PatternMatrix requires numpy")
+        self.words = list(words)
+        self.index = {word: i for i, word in enumerate(self.words)}
+        self.key = word_list_hash(self.words)
+        self.num_patterns = num_patterns(len(self.words[0])) if self.words else num_patterns()
+        self.matrix = self._load_or_build(cache_dir)
+
+    def _cache_path(self, cache_dir):
+        return os.path.join(cache_dir, f"patterns_v{CACHE_VERSION}_{self.key}.npy")
+
+    def _load_or_build(self, cache_dir):
+        if cache_dir is None:
+            return build_matrix(self.words)
+
+        path = self._cache_path(cache_dir)
+        if os.path.exists(path):
+            matrix = np.load(path, mmap_mode="r")
+            if matrix.shape == (len(self.words), len(self.words)):
+                return matrix
+
+        matrix = build_matrix(self.words)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, matrix)
+        os.replace(tmp_path, path)
+        return np.load(path, mmap_mode="r")
+
+    def indices(self, words):
+        return np.fromiter((self.index[word] for word in words), dtype=np.intp, count=len(words))
+
+    def covers(self, words):
+        return all(word in self.index for word in words)
+
+    def worst_case_bucket(self, guess_index, secret_indices):
+        """Size of the largest feedback bucket a guess splits the secrets into"""
+        return int(np.bincount(self.matrix[guess_index][secret_indices], minlength=self.num_patterns).max())
+
+    def entropies(self, secret_indices, chunk_size=512):
+        """Expected information in bits of every word as a guess against the secrets.
+
+        Rows are processed in chunks; each chunk's patterns are offset by
+        ``row * num_patterns`` so one ``np.bincount`` yields the bucket sizes
+        of all its guesses at once.
+        """
+        total = len(secret_indices)
+        result = np.zeros(len(self.words))
+        if total == 0:
+            return result
+
+        counts_range = np.arange(total + 1, dtype=np.float64)
+        n_log_n = np.zeros(total + 1)
+        n_log_n[1:] = counts_range[1:] * np.log2(counts_range[1:])
+
+        for start in range(0, len(self.words), chunk_size):
+            block = self.matrix[start:start + chunk_size][:, secret_indices]
+            rows = block.shape[0]
+            offsets = (np.arange(rows, dtype=np.intp) * self.num_patterns)[:, None]
+            counts = np.bincount((block + offsets).ravel(), minlength=rows * self.num_patterns)
+            bucket_terms = n_log_n[counts].reshape(rows, self.num_patterns).sum(axis=1)
+            result[start:start + rows] = np.log2(total) - bucket_terms / total
+
+        return result
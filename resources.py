@@ -0,0 +1,88 @@
+"""Process-wide shared game resources.
+
+The dictionary, positional model and solver indexes are immutable once
+built, so every session in a server process shares one copy; sessions only
+hold their own small mutable game and solver state. Each word length gets
+its own set, built the first time a session asks for that length, so modes
+nobody plays cost neither startup time nor memory.
+"""
+import functools
+import sys
+
+from ai_solver import AISolver
+from dictionary import WORD_LENGTH
+from opening_book import OpeningBook
+from word_generator import WordGenerator
+from word_index import get_index
+
+_built = set()
+_built_books = set()
+
+
+@functools.lru_cache(maxsize=None)
+def shared_word_generator(word_file=None, length=WORD_LENGTH):
+    generator = WordGenerator(word_file, length)
+    _built.add(length)
+    return generator
+
+
+def shared_word_index(length=WORD_LENGTH):
+    return get_index(shared_word_generator(length=length).valid_words)
+
+
+@functools.lru_cache(maxsize=None)
+def shared_book(length=WORD_LENGTH, strategy="minimax"):
+    """Cached opening book for this dictionary and strategy, or None if none has been built"""
+    book = OpeningBook.load_for(shared_word_generator(length=length).valid_words, strategy)
+    _built_books.add((length, strategy))
+    return book
+
+
+def new_solver(length=WORD_LENGTH, **kwargs):
+    """Per-session solver over the shared dictionary, index and opening book for one word length"""
+    words = shared_word_generator(length=length).valid_words
+    kwargs.setdefault("book", shared_book(length, kwargs.get("strategy", "minimax")))
+    return AISolver(words, index=shared_word_index(length), **kwargs)
+
+
+def _shared_ids():
+    return _shared_ids_for(frozenset(_built), frozenset(_built_books))
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_ids_for(lengths, books):
+    ids = set()
+    for length in lengths:
+        _deep_size(shared_word_generator(length=length), ids)
+        _deep_size(shared_word_index(length), ids)
+    for length, strategy in books:
+        _deep_size(shared_book(length, strategy), ids)
+    return frozenset(ids)
+
+
+def _deep_size(obj, seen, skip=frozenset()):
+    pending = [obj]
+    total = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or id(obj) in skip:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            pending.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            pending.append(obj.__dict__)
+        elif hasattr(obj, "__slots__"):
+            pending.extend(getattr(obj, name) for name in obj.__slots__ if hasattr(obj, name))
+    return total
+
+
+def session_footprint(state):
+    """Approximate bytes held by each session-state entry, excluding shared resources"""
+    shared = _shared_ids()
+    return {key: _deep_size(state[key], set(), shared) for key in list(state.keys())}
@@ -0,0 +1,192 @@
+"""Versioned database schema.
+
+This is the only place tables and indexes are defined. Each migration moves
+a database from ``PRAGMA user_version`` N-1 to N inside one transaction, so
+databases created by any earlier copy of the schema (app.py, user_manager.py,
+archive.py or the former tables.py) are converted in place the first time
+they are opened.
+
+Tables:
+    users        accounts and lifetime counters
+    leaderboard  score per player
+    archive      one row per submitted guess (``word``) with the secret (``realWord``)
+    games        one row per finished game
+    word_stats        per-secret-word totals, maintained by stats.record
+    user_daily_stats  per-user per-day totals, maintained by stats.record
+"""
+import db
+
+USERS = '''
+    CREATE TABLE users (
+        username TEXT PRIMARY KEY,
+        password TEXT NOT NULL,
+        games_played INTEGER DEFAULT 0,
+        games_won INTEGER DEFAULT 0,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+LEADERBOARD = '''
+    CREATE TABLE leaderboard (
+        username TEXT PRIMARY KEY,
+        games_played INTEGER DEFAULT 0,
+        games_won INTEGER DEFAULT 0,
+        score INTEGER DEFAULT 0,
+        last_update DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (username) REFERENCES users(username)
+    )
+'''
+
+ARCHIVE = '''
+    CREATE TABLE archive (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        word TEXT NOT NULL,
+        realWord TEXT NOT NULL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+GAMES = '''
+    CREATE TABLE games (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        word TEXT NOT NULL,
+        guesses TEXT,
+        attempts INTEGER DEFAULT 0,
+        won BOOLEAN DEFAULT 0,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _rebuild(conn, table, create_sql, copy_sql):
+    """Recreate a table with a new definition: create ``<table>_new``, copy, drop, rename.
+
+    Renaming the new table into place (rather than the old one out of the
+    way) keeps foreign keys in other tables pointing at ``table``.
+    """
+    conn.execute(create_sql.replace(f"CREATE TABLE {table} ", f"CREATE TABLE {table}_new ", 1))
+    conn.execute(copy_sql)
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+
+def _migrate_tables(conn):
+    """v1: one definition of every table, converting the legacy variants"""
+    users = _columns(conn, 'users')
+    if not users:
+        conn.execute(USERS)
+    elif 'created_at' not in users:
+        # app.py's users table had no NOT NULL or defaults; rebuild it.
+        _rebuild(conn, 'users', USERS, '''
+            INSERT INTO users_new (username, password, games_played, games_won, created_at)
+            SELECT username, COALESCE(password, ''), COALESCE(games_played, 0), COALESCE(games_won, 0), NULL
+            FROM users
+        ''')
+
+    if not _columns(conn, 'leaderboard'):
+        conn.execute(LEADERBOARD)
+
+    if not _columns(conn, 'games'):
+        conn.execute(GAMES)
+
+    archive = _columns(conn, 'archive')
+    if not archive:
+        conn.execute(ARCHIVE)
+    elif 'guesses' in archive:
+        # user_manager.py / tables.py stored whole games in "archive".
+        conn.execute('''
+            INSERT INTO games (username, word, guesses, attempts, won, timestamp)
+            SELECT username, word, guesses,
+                   CASE WHEN guesses IS NULL OR guesses = '' THEN 0
+                        ELSE length(guesses) - length(replace(guesses, ',', '')) + 1 END,
+                   COALESCE(won, 0), timestamp
+            FROM archive
+            ORDER BY id
+        ''')
+        conn.execute("DROP TABLE archive")
+        conn.execute(ARCHIVE)
+    elif 'realWord' not in archive:
+        _rebuild(conn, 'archive', ARCHIVE, '''
+            INSERT INTO archive_new (id, username, word, realWord, timestamp)
+            SELECT id, username, word, '', timestamp FROM archive
+        ''')
+
+
+def _migrate_indexes(conn):
+    """v2: indexes for the per-user history and leaderboard query paths"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_archive_user_time ON archive (username, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_games_user_time ON games (username, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_leaderboard_score ON leaderboard (score DESC, username)")
+
+
+def _migrate_summary_tables(conn):
+    """v3: incrementally maintained summaries for word difficulty and daily activity"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS word_stats (
+            word TEXT PRIMARY KEY,
+            games INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            total_guesses INTEGER NOT NULL DEFAULT 0,
+            win_guesses INTEGER NOT NULL DEFAULT 0,
+            last_played DATETIME
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS user_daily_stats (
+            username TEXT NOT NULL,
+            day TEXT NOT NULL,
+            games INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            total_guesses INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (username, day)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_word_stats_win_rate ON word_stats (CAST(wins AS REAL) / games, games DESC)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_games_word ON games (word)")
+
+
+MIGRATIONS = [
+    _migrate_tables,
+    _migrate_indexes,
+    _migrate_summary_tables,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(conn):
+    """Bring a connection's database up to SCHEMA_VERSION; returns the version it started at"""
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                migration(conn)
+                conn.execute(f"PRAGMA user_version = {number}")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    finally:
+        conn.isolation_level = isolation_level
+    return version
+
+
+_ready = set()
+
+
+def ensure_schema():
+    """Migrate the pooled database once per process"""
+    if db.DB_NAME in _ready:
+        return
+    with db.connection() as conn:
+        migrate(conn)
+    _ready.add(db.DB_NAME)
@@ -0,0 +1,112 @@
+"""Single source of truth for Wuzzle feedback.
+
+A feedback pattern is packed into one integer: position ``i`` contributes
+``digit * 3**i`` with absent=0, present=1, correct=2, so a five-letter
+pattern fits in a byte (0..242) and an eight-letter one in 16 bits. Greens are assigned first, then yellows
+left to right while the secret still has unmatched copies of the letter.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WORD_LENGTH = 5
+ABSENT, PRESENT, CORRECT = 0, 1, 2
+LABELS = ('absent', 'present', 'correct')
+DIGITS = {label: digit for digit, label in enumerate(LABELS)}
+POWERS = tuple(3 ** i for i in range(16))
+
+# Batches smaller than this are scored in pure Python even when numpy is available.
+NUMPY_MIN_PAIRS = 256
+
+
+def score(guess, secret):
+    """Packed feedback pattern for one guess against one secret"""
+    pattern = 0
+    unmatched = ""
+    for i, (g, s) in enumerate(zip(guess, secret)):
+        if g == s:
+            pattern += CORRECT * POWERS[i]
+        else:
+            unmatched += s
+
+    if not unmatched:
+        return pattern
+
+    for i, (g, s) in enumerate(zip(guess, secret)):
+        if g != s and g in unmatched:
+            pattern += PRESENT * POWERS[i]
+            unmatched = unmatched.replace(g, "", 1)
+
+    return pattern
+
+
+def solved_pattern(length=WORD_LENGTH):
+    return CORRECT * (POWERS[length] - 1) // 2
+
+
+def num_patterns(length=WORD_LENGTH):
+    return POWERS[length]
+
+
+def pattern_key(pattern, length=WORD_LENGTH):
+    """Fixed-width hex form of a pattern, concatenated into solver feedback keys"""
+    width = len(f"{num_patterns(length) - 1:x}")
+    return f"{pattern:0{width}x}"
+
+
+def digits(pattern, length=WORD_LENGTH):
+    result = []
+    for _ in range(length):
+        pattern, digit = divmod(pattern, 3)
+        result.append(digit)
+    return result
+
+
+def labels(pattern, length=WORD_LENGTH):
+    """'absent' / 'present' / 'correct' per position, as the solver reports it"""
+    return [LABELS[digit] for digit in digits(pattern, length)]
+
+
+def pack(feedback):
+    """Packed pattern for a list of labels"""
+    return sum(DIGITS[label] * POWERS[i] for i, label in enumerate(feedback))
+
+
+def encode_words(words):
+    length = len(words[0]) if words else WORD_LENGTH
+    return np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8).reshape(len(words), length)
+
+
+def score_block(guesses, secrets):
+    """Vectorized ``score`` for every pair of two blocks of encoded words"""
+    g = guesses[:, None, :]
+    s = secrets[None, :, :]
+    green = g == s
+    not_green = ~green
+    patterns = np.zeros(green.shape[:2], dtype=np.uint8 if g.shape[2] <= 5 else np.uint16)
+
+    for i in range(g.shape[2]):
+        letter = g[:, :, i:i + 1]
+        # A non-green guess letter is yellow while the secret still has unmatched
+        # copies of it left after earlier non-green occurrences took theirs.
+        available = ((s == letter) & not_green).sum(axis=2)
+        used = ((g[:, :, :i] == letter) & not_green[:, :, :i]).sum(axis=2)
+        present = not_green[:, :, i] & (used < available)
+        digit = np.where(green[:, :, i], CORRECT, present.astype(patterns.dtype)).astype(patterns.dtype)
+        patterns += digit * patterns.dtype.type(POWERS[i])
+
+    return patterns
+
+
+def score_many(guesses, secrets):
+    """Packed patterns for every guess against every secret, one row per guess.
+
+    Uses the vectorized numpy scorer for large batches when numpy is
+    installed and falls back to ``score`` otherwise.
+    """
+    guesses = [guess.upper() for guess in guesses]
+    secrets = [secret.upper() for secret in secrets]
+    if np is not None and len(guesses) * len(secrets) >= NUMPY_MIN_PAIRS:
+        return score_block(encode_words(guesses), encode_words(secrets)).tolist()
+    return [[score(guess, secret) for secret in secrets] for guess in guesses]
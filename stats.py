@@ -0,0 +1,127 @@
+"""Per-word difficulty and per-user daily activity.
+
+``word_stats`` and ``user_daily_stats`` are summary tables updated by
+``record`` inside the same transaction that writes each game row, so
+dashboard reads are primary-key lookups or short index scans instead of
+aggregations over ``games``. ``python stats.py rebuild`` recomputes both
+from ``games`` to backfill existing databases.
+"""
+import db
+from schema import ensure_schema
+
+UPSERT_WORD = """
+    INSERT INTO word_stats (word, games, wins, total_guesses, win_guesses, last_played)
+    VALUES (?, 1, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(word) DO UPDATE SET
+        games = games + 1,
+        wins = wins + excluded.wins,
+        total_guesses = total_guesses + excluded.total_guesses,
+        win_guesses = win_guesses + excluded.win_guesses,
+        last_played = CURRENT_TIMESTAMP
+"""
+
+UPSERT_USER_DAY = """
+    INSERT INTO user_daily_stats (username, day, games, wins, total_guesses)
+    VALUES (?, date('now'), 1, ?, ?)
+    ON CONFLICT(username, day) DO UPDATE SET
+        games = games + 1,
+        wins = wins + excluded.wins,
+        total_guesses = total_guesses + excluded.total_guesses
+"""
+
+
+def record(conn, username, word, won, attempts):
+    """Fold one finished game into the summaries inside the caller's transaction"""
+    won = 1 if won else 0
+    conn.execute(UPSERT_WORD, (word.upper(), won, attempts, attempts if won else 0))
+    conn.execute(UPSERT_USER_DAY, (username, won, attempts))
+
+
+def rebuild_stats():
+    """Recompute both summary tables from the games table; returns the number of words"""
+    ensure_schema()
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM word_stats")
+        conn.execute("DELETE FROM user_daily_stats")
+        conn.execute("""
+            INSERT INTO word_stats (word, games, wins, total_guesses, win_guesses, last_played)
+            SELECT word, COUNT(*), SUM(won != 0), SUM(attempts),
+                   SUM(CASE WHEN won != 0 THEN attempts ELSE 0 END), MAX(timestamp)
+            FROM games
+            GROUP BY word
+        """)
+        conn.execute("""
+            INSERT INTO user_daily_stats (username, day, games, wins, total_guesses)
+            SELECT username, date(timestamp), COUNT(*), SUM(won != 0), SUM(attempts)
+            FROM games
+            GROUP BY username, date(timestamp)
+        """)
+        return conn.execute("SELECT COUNT(*) FROM word_stats").fetchone()[0]
+
+
+def _word_row(row):
+    word, games, wins, total_guesses, win_guesses = row
+    return {
+        "word": word,
+        "games": games,
+        "wins": wins,
+        "win_rate": wins / games if games else 0.0,
+        "avg_guesses": total_guesses / games if games else 0.0,
+        "avg_guesses_to_win": win_guesses / wins if wins else None,
+    }
+
+
+def get_word_stats(word):
+    """Global win rate and average guesses for one secret word, or None if never played"""
+    row = db.fetchone("""
+        SELECT word, games, wins, total_guesses, win_guesses
+        FROM word_stats WHERE word = ?
+    """, (word.upper(),))
+    return _word_row(row) if row else None
+
+
+def hardest_words(limit=10, min_games=1):
+    """Words with the lowest win rate, read in index order"""
+    rows = db.fetchall("""
+        SELECT word, games, wins, total_guesses, win_guesses
+        FROM word_stats
+        WHERE games >= ?
+        ORDER BY CAST(wins AS REAL) / games, games DESC
+        LIMIT ?
+    """, (min_games, limit))
+    return [_word_row(row) for row in rows]
+
+
+def get_global_stats():
+    """Totals across every game, summed from one word_stats row per distinct secret"""
+    games, wins, total_guesses = db.fetchone("""
+        SELECT COALESCE(SUM(games), 0), COALESCE(SUM(wins), 0), COALESCE(SUM(total_guesses), 0)
+        FROM word_stats
+    """)
+    return {
+        "games": games,
+        "wins": wins,
+        "win_rate": wins / games if games else 0.0,
+        "avg_guesses": total_guesses / games if games else 0.0,
+    }
+
+
+def get_user_daily_stats(username, days=30):
+    """(day, games, wins, total_guesses) rows for a user's most recent active days"""
+    return db.fetchall("""
+        SELECT day, games, wins, total_guesses
+        FROM user_daily_stats
+        WHERE username = ?
+        ORDER BY day DESC
+        LIMIT ?
+    """, (username, days))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the game summary tables")
+    parser.add_argument("command", choices=["rebuild"])
+    args = parser.parse_args()
+
+    print(f"Rebuilt statistics for {rebuild_stats()} words")
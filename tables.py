@@ -1,34 +0,0 @@
-import sqlite3
-
-def connect_db():
-    conn = sqlite3.connect('wuzzle.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS leaderboard(
-            username TEXT PRIMARY KEY,
-            games_played INTEGER DEFAULT 0,
-            games_won INTEGER DEFAULT 0,
-            score INTEGER DEFAULT 0,
-            last_update DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users(
-            username TEXT PRIMARY KEY,
-            password TEXT NOT NULL,
-            games_played INTEGER DEFAULT 0,
-            games_won INTEGER DEFAULT 0
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS archive(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL,
-            word TEXT NOT NULL,
-            guesses TEXT NOT NULL,
-            won BOOLEAN NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    conn.commit()
-    return conn
\ No newline at end of file
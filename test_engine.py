@@ -0,0 +1,53 @@
+"""Recorded engine games end up in the database."""
+import pytest
+
+import archive
+import db
+import leaderboard
+from engine import GameEngine
+from user_manager import create_user
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    previous = db.DB_NAME
+    db.configure(str(tmp_path / "wuzzle_engine.db"))
+    yield
+    archive.close_writer()
+    db.configure(previous)
+    leaderboard.invalidate_cache()
+
+
+def test_recorded_game_is_committed(temp_db):
+    # The engine migrates a fresh database itself; nothing else has run ensure_schema.
+    engine = GameEngine()
+    assert create_user("alice", "secret")
+
+    game_id = engine.new_game(username="alice", secret="SLATE")
+    engine.guess(game_id, "CRANE")
+    assert engine.guess(game_id, "SLATE")["won"]
+    engine.close()
+    archive.close_writer()
+
+    assert db.fetchall("SELECT username, word, guesses, attempts, won FROM games") == [
+        ("alice", "SLATE", "CRANE,SLATE", 2, 1),
+    ]
+    assert db.fetchone(
+        "SELECT games_played, games_won, score FROM leaderboard WHERE username = ?", ("alice",)
+    ) == (1, 1, leaderboard.score_for(True))
+    assert db.fetchall("SELECT word, realWord FROM archive WHERE username = ?", ("alice",)) == [
+        ("CRANE", "SLATE"), ("SLATE", "SLATE"),
+    ]
+
+
+def test_unknown_user_plays_anonymously(temp_db):
+    engine = GameEngine()
+    game_id = engine.new_game(username="nobody", secret="SLATE")
+    state = engine.guess(game_id, "SLATE")
+    engine.close()
+    archive.close_writer()
+
+    assert state["won"] and state["username"] is None
+    assert db.fetchone("SELECT COUNT(*) FROM leaderboard") == (0,)
+    assert db.fetchone("SELECT COUNT(*) FROM games") == (0,)
+    assert db.fetchone("SELECT COUNT(*) FROM archive") == (0,)
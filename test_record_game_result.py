@@ -0,0 +1,67 @@
+"""record_game_result keeps every summary consistent under concurrent writers."""
+import threading
+
+import pytest
+
+import db
+import leaderboard
+from user_manager import create_user, init_database, record_game_result
+
+PLAYERS = 8
+GAMES = 30
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    previous = db.DB_NAME
+    db.configure(str(tmp_path / "wuzzle_test.db"))
+    init_database()
+    yield
+    db.configure(previous)
+    leaderboard.invalidate_cache()
+
+
+def _play(player, errors):
+    username = f"player{player}"
+    try:
+        for game in range(GAMES):
+            won = game % 3 != 0
+            guesses = ["CRANE", "SLATE"] if won else ["CRANE"] * 6
+            record_game_result(username, won, guesses, "SLATE" if won else "FUZZY")
+    except Exception as e:
+        errors.append(e)
+
+
+def test_parallel_writers_keep_counts_exact(temp_db):
+    for player in range(PLAYERS):
+        assert create_user(f"player{player}", "secret")
+
+    errors = []
+    threads = [threading.Thread(target=_play, args=(player, errors)) for player in range(PLAYERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+    wins_per_player = sum(1 for game in range(GAMES) if game % 3 != 0)
+    total_games = PLAYERS * GAMES
+    total_wins = PLAYERS * wins_per_player
+
+    for player in range(PLAYERS):
+        username = f"player{player}"
+        assert db.fetchone(
+            "SELECT games_played, games_won FROM users WHERE username = ?", (username,)
+        ) == (GAMES, wins_per_player)
+        assert db.fetchone(
+            "SELECT games_played, games_won, score FROM leaderboard WHERE username = ?", (username,)
+        ) == (GAMES, wins_per_player, leaderboard.score_for(True) * wins_per_player
+              + leaderboard.score_for(False) * (GAMES - wins_per_player))
+        assert db.fetchone("SELECT COUNT(*) FROM games WHERE username = ?", (username,)) == (GAMES,)
+
+    assert db.fetchone("SELECT COUNT(*), SUM(won) FROM games") == (total_games, total_wins)
+    assert db.fetchall("SELECT word, games, wins FROM word_stats ORDER BY word") == [
+        ("FUZZY", total_games - total_wins, 0),
+        ("SLATE", total_wins, total_wins),
+    ]
+    assert db.fetchone("SELECT SUM(games), SUM(wins) FROM user_daily_stats") == (total_games, total_wins)
@@ -1,52 +1,37 @@
 import sqlite3
 import hashlib
+import threading
 from datetime import datetime
 
-DB_NAME = "C:\Codes\Wuzz\wuzzle_users.db"
+import db
+import metrics
+import stats
+from schema import ensure_schema
+from archive import PAGE_SIZE, paginate
+from leaderboard import update_leaderboard, get_leaderboard, invalidate_cache, upsert_result
+
+UPDATE_USER_STATS = """
+    UPDATE users
+    SET games_played = games_played + 1,
+        games_won = games_won + ?
+    WHERE username = ?
+"""
+
+# Bumped whenever a user's counters change, so per-session StatsCache
+# entries for that user (in any session of this process) go stale.
+_stats_versions = {}
+_stats_versions_lock = threading.Lock()
+
+def _bump_stats_version(username):
+    with _stats_versions_lock:
+        _stats_versions[username] = _stats_versions.get(username, 0) + 1
+
+def stats_version(username):
+    return _stats_versions.get(username, 0)
 
 def init_database():
     """Initialize all database tables"""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    
-    #authentication
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS users (
-        username TEXT PRIMARY KEY,
-        password TEXT NOT NULL,
-        games_played INTEGER DEFAULT 0,
-        games_won INTEGER DEFAULT 0,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    # Leaderboard
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS leaderboard (
-        username TEXT PRIMARY KEY,
-        games_played INTEGER DEFAULT 0,
-        games_won INTEGER DEFAULT 0,
-        score INTEGER DEFAULT 0,
-        last_update DATETIME DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (username) REFERENCES users(username)
-    )
-    ''')
-    
-    # Archive
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS archive (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT NOT NULL,
-        word TEXT NOT NULL,
-        guesses TEXT,
-        won BOOLEAN DEFAULT 0,
-        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (username) REFERENCES users(username)
-    )
-    ''')
-    
-    conn.commit()
-    conn.close()
+    ensure_schema()
 
 def hash_password(password):
     """Hash a password for storing"""
@@ -54,137 +39,96 @@ def hash_password(password):
 
 def create_user(username, password):
     """Create a new user"""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    
     try:
         hashed_password = hash_password(password)
-        cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", 
-                      (username, hashed_password))
-        conn.commit()
-        result = True
+        db.execute("INSERT INTO users (username, password) VALUES (?, ?)",
+                   (username, hashed_password))
+        return True
     except sqlite3.IntegrityError:
-        result = False
-    finally:
-        conn.close()
-    
-    return result
+        return False
 
+@metrics.timed("db.authenticate_user")
 def authenticate_user(username, password):
     """Verify user credentials"""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT password FROM users WHERE username = ?", (username,))
-    result = cursor.fetchone()
-    conn.close()
-    
+    result = db.fetchone("SELECT password FROM users WHERE username = ?", (username,))
+
     if result and result[0] == hash_password(password):
         return True
     return False
 
+def user_exists(username):
+    """Whether an account with this username has been created"""
+    return db.fetchone("SELECT 1 FROM users WHERE username = ?", (username,)) is not None
+
+@metrics.timed("db.update_user_stats")
 def update_user_stats(username, won=False):
     """Update user statistics after a game"""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    
-    cursor.execute("UPDATE users SET games_played = games_played + 1 WHERE username = ?", (username,))
-    if won:
-        cursor.execute("UPDATE users SET games_won = games_won + 1 WHERE username = ?", (username,))
-    conn.commit()
-    conn.close()
-    
-    # Also update the leaderboard
-    update_leaderboard(username, won)
-
-def update_leaderboard(username, won=False):
-    """Update the leaderboard after a game"""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    
-    # Calculate score - simple version: 10 points per win, 1 point for playing
-    score_to_add = 10 if won else 1
-    
-    # Check if user exists in leaderboard
-    cursor.execute("SELECT username FROM leaderboard WHERE username = ?", (username,))
-    user_exists = cursor.fetchone()
-    
-    if user_exists:
-        # Update existing user
-        cursor.execute("""
-            UPDATE leaderboard 
-            SET games_played = games_played + 1, 
-                games_won = games_won + CASE WHEN ? THEN 1 ELSE 0 END,
-                score = score + ?,
-                last_update = CURRENT_TIMESTAMP
-            WHERE username = ?
-        """, (won, score_to_add, username))
-    else:
-        # Add new user to leaderboard
-        cursor.execute("""
-            INSERT INTO leaderboard (username, games_played, games_won, score)
-            VALUES (?, 1, ?, ?)
-        """, (username, 1 if won else 0, score_to_add))
-    
-    conn.commit()
-    conn.close()
+    with db.transaction() as conn:
+        conn.execute(UPDATE_USER_STATS, (1 if won else 0, username))
+        # Also update the leaderboard
+        upsert_result(conn, username, won)
+    _bump_stats_version(username)
+    invalidate_cache()
 
+@metrics.timed("db.record_game_result")
+def record_game_result(username, won, guesses, word):
+    """Commit a finished game in one transaction: user stats, leaderboard, game archive and summaries"""
+    guesses = [guess.upper() for guess in guesses]
+    with db.transaction() as conn:
+        conn.execute(UPDATE_USER_STATS, (1 if won else 0, username))
+        upsert_result(conn, username, won)
+        conn.execute("""
+            INSERT INTO games (username, word, guesses, attempts, won)
+            VALUES (?, ?, ?, ?, ?)
+        """, (username, word.upper(), ",".join(guesses), len(guesses), 1 if won else 0))
+        stats.record(conn, username, word, won, len(guesses))
+    _bump_stats_version(username)
+    invalidate_cache()
+
+@metrics.timed("db.get_user_stats")
 def get_user_stats(username):
     """Get user stats"""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT games_played, games_won FROM users WHERE username = ?", (username,))
-    result = cursor.fetchone()
-    conn.close()
-    
+    result = db.fetchone("SELECT games_played, games_won FROM users WHERE username = ?", (username,))
+
     if result:
         return {"games_played": result[0], "games_won": result[1]}
     return {"games_played": 0, "games_won": 0}
 
+class StatsCache:
+    """Per-session copy of get_user_stats, re-read only after that user's stats change"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+
+    def get(self, username):
+        version = stats_version(username)
+        entry = self._entries.get(username)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        user_stats = get_user_stats(username)
+        self._entries[username] = (version, user_stats)
+        return user_stats
+
+    def invalidate(self, username=None):
+        if username is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(username, None)
+
 def archive_game(username, word, guesses="", won=False):
     """Archive a game result"""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        INSERT INTO archive (username, word, guesses, won)
-        VALUES (?, ?, ?, ?)
-    """, (username, word.upper(), guesses, won))
-    
-    conn.commit()
-    conn.close()
-
-def get_user_archive(username):
-    """Get user's game history"""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT word, guesses, won, timestamp 
-        FROM archive 
-        WHERE username = ? 
-        ORDER BY timestamp DESC
-    """, (username,))
-    
-    results = cursor.fetchall()
-    conn.close()
-    
-    return results
-
-def get_leaderboard(limit=10):
-    """Get top users by score"""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT username, games_played, games_won, score, last_update
-        FROM leaderboard
-        ORDER BY score DESC
-        LIMIT ?
-    """, (limit,))
-    
-    results = cursor.fetchall()
-    conn.close()
-    
-    return results
\ No newline at end of file
+    attempts = len(guesses.split(",")) if guesses else 0
+    with db.transaction() as conn:
+        conn.execute("""
+            INSERT INTO games (username, word, guesses, attempts, won)
+            VALUES (?, ?, ?, ?, ?)
+        """, (username, word.upper(), guesses, attempts, won))
+        stats.record(conn, username, word, won, attempts)
+
+def get_user_archive(username, before_id=None, limit=PAGE_SIZE):
+    """Get one page of user's game history, newest first, as (id, word, guesses, won, timestamp) rows"""
+    return paginate('games', ('word', 'guesses', 'won', 'timestamp'), username, before_id, limit)
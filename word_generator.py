@@ -1,21 +1,27 @@
 import random
 from collections import Counter
-import nltk
-from nltk.corpus import words as nltk_words
+from dictionary import WORD_LENGTH, load_words
 
 
-nltk.download('words')
 class WordGenerator:
-    def __init__(self):
-        self.valid_words = [w.upper() for w in nltk_words.words() if len(w) == 5 and w.isalpha()]
-        
+    def __init__(self, word_file=None, length=WORD_LENGTH):
+        self.word_length = length
+        self.valid_words = load_words(word_file, length)
+        if not self.valid_words:
+            raise ValueError(f"The dictionary has no {length}-letter words")
+        self.word_set = frozenset(self.valid_words)
+
         self.position_probs = self._train_probability_model()
+        # Sampling a letter per position and rejecting non-words picks each word
+        # with probability proportional to the product of its letter
+        # probabilities; the alias table draws from that distribution in O(1).
+        self.alias_prob, self.alias = self._build_alias_table()
 
     def _train_probability_model(self):
         """Calculate how often each letter appears in each position"""
-        position_probs = [{} for _ in range(5)]
+        position_probs = [{} for _ in range(self.word_length)]
 
-        for pos in range(5):
+        for pos in range(self.word_length):
             counter = Counter(word[pos] for word in self.valid_words)
             total_letters = sum(counter.values())
             
@@ -23,20 +29,43 @@ class WordGenerator:
                                     for char, count in counter.items()}
         return position_probs
 
+    def _build_alias_table(self):
+        """Alias table over the dictionary, weighting each word by the product
+        of its positional letter probabilities (Vose's method)"""
+        weights = []
+        for word in self.valid_words:
+            weight = 1.0
+            for pos, char in enumerate(word):
+                weight *= self.position_probs[pos][char]
+            weights.append(weight)
+
+        n = len(weights)
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            lo, hi = small.pop(), large.pop()
+            prob[lo] = scaled[lo]
+            alias[lo] = hi
+            scaled[hi] -= 1.0 - scaled[lo]
+            (small if scaled[hi] < 1.0 else large).append(hi)
+
+        return prob, alias
+
+    def is_valid_word(self, word):
+        return word.upper() in self.word_set
+
     def generate_word(self):
         """Generate a word using letter probabilities"""
-        for _ in range(100):
-            letters = [
-                random.choices(
-                    list(self.position_probs[pos].keys()),
-                    weights=list(self.position_probs[pos].values())
-                )[0]
-                for pos in range(5)
-            ]
-            candidate = ''.join(letters)
-            
-            if candidate in self.valid_words:
-                return candidate
-        
-        return random.choice(self.valid_words)
+        i = random.randrange(len(self.valid_words))
+        if random.random() >= self.alias_prob[i]:
+            i = self.alias[i]
+        return self.valid_words[i]
 
+    def generate_words(self, n):
+        """Generate n words at once, e.g. to pre-generate puzzles"""
+        return [self.generate_word() for _ in range(n)]
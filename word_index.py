@@ -0,0 +1,89 @@
+from collections import Counter, defaultdict
+from itertools import compress
+
+from pattern_matrix import word_list_hash
+
+_BITS = bytes.maketrans(b"01", b"\x00\x01")
+
+_indexes = {}
+
+
+def get_index(words):
+    """WordIndex for a word list, built once per distinct dictionary"""
+    key = word_list_hash(words)
+    if key not in _indexes:
+        _indexes[key] = WordIndex(words)
+    return _indexes[key]
+
+
+def _to_mask(positions, size):
+    bits = bytearray((size + 7) // 8)
+    for i in positions:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+class WordIndex:
+    """Bitset index over a word list; bit ``i`` of a mask stands for ``words[i]``.
+
+    ``position[(letter, i)]`` holds the words with ``letter`` at position ``i``
+    and ``min_count[(letter, k)]`` the words containing at least ``k`` copies
+    of ``letter``, so a feedback pattern becomes a handful of AND / AND NOT
+    operations on Python ints.
+    """
+
+    def __init__(self, words):
+        self.words = list(words)
+        self.lookup = {word: i for i, word in enumerate(self.words)}
+        self.all_mask = (1 << len(self.words)) - 1
+
+        by_position = defaultdict(list)
+        by_count = defaultdict(list)
+        for i, word in enumerate(self.words):
+            for pos, letter in enumerate(word):
+                by_position[(letter, pos)].append(i)
+            for letter, count in Counter(word).items():
+                for k in range(1, count + 1):
+                    by_count[(letter, k)].append(i)
+
+        size = len(self.words)
+        self.position = {key: _to_mask(ids, size) for key, ids in by_position.items()}
+        self.min_count = {key: _to_mask(ids, size) for key, ids in by_count.items()}
+
+    def filter(self, mask, guess, feedback):
+        """Narrow ``mask`` to the words that would give ``feedback`` for ``guess``"""
+        marked = Counter()
+        capped = set()
+
+        for i, (letter, label) in enumerate(zip(guess, feedback)):
+            if label == 'correct':
+                mask &= self.position.get((letter, i), 0)
+                marked[letter] += 1
+            else:
+                mask &= ~self.position.get((letter, i), 0)
+                if label == 'present':
+                    marked[letter] += 1
+                else:
+                    capped.add(letter)
+
+        # Every green or yellow copy proves one more copy of the letter; a grey
+        # copy of the same letter means there are no copies beyond those.
+        for letter in set(guess):
+            if marked[letter]:
+                mask &= self.min_count.get((letter, marked[letter]), 0)
+            if letter in capped:
+                mask &= ~self.min_count.get((letter, marked[letter] + 1), 0)
+
+        return mask
+
+    def mask_of(self, words):
+        return _to_mask((self.lookup[word] for word in words), len(self.words))
+
+    def words_in(self, mask):
+        """Words of a mask in dictionary order"""
+        bits = bin(mask)[:1:-1].encode("ascii").translate(_BITS)
+        return list(compress(self.words, bits))
+
+    @staticmethod
+    def count(mask):
+        return bin(mask).count("1")